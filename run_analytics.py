@@ -0,0 +1,90 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+DAY = 86400
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _parse_date(value):
+    return int(datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+
+
+def _day_name(day_start):
+    return datetime.fromtimestamp(day_start, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _init_worker():
+    # Forked workers must not share the parent's pooled DB connections
+    from streamlit_app.utils.db import get_engine
+
+    get_engine().dispose(close=False)
+
+
+def _write(df, out_dir, dataset, day_start, fmt):
+    """Write one day partition as <out>/<dataset>/date=YYYY-MM-DD.<fmt>."""
+    target = os.path.join(out_dir, dataset)
+    os.makedirs(target, exist_ok=True)
+    path = os.path.join(target, f"date={_day_name(day_start)}.{fmt}")
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def analyze_day(day_start, out_dir, fmt):
+    """Analyze one day of recorded snapshots (runs in a worker process)."""
+    from streamlit_app.utils import analytics, history, refdata
+
+    positions = history.load_history(day_start, day_start + DAY)
+    if positions.empty:
+        return day_start, 0, []
+
+    phase_stats, airport_traffic = analytics.summarize_history(positions, refdata.coded_airports())
+    written = [
+        _write(phase_stats, out_dir, "phase_stats", day_start, fmt),
+        _write(airport_traffic, out_dir, "airport_traffic", day_start, fmt),
+    ]
+    return day_start, positions["snapshot_ts"].nunique(), written
+
+
+def _output_format():
+    try:
+        import pyarrow  # noqa: F401
+        return "parquet"
+    except ImportError:
+        print("⚠️ pyarrow not installed — writing CSV instead of Parquet")
+        return "csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute traffic, congestion and phase statistics over recorded history")
+    parser.add_argument("--start", type=_parse_date, help="first day (YYYY-MM-DD, UTC)")
+    parser.add_argument("--end", type=_parse_date, help="day after the last day (YYYY-MM-DD, UTC)")
+    parser.add_argument("--days", type=int, default=1, help="analyze the last N days when --start is omitted")
+    parser.add_argument("--out", default=os.path.join(PROJECT_ROOT, "data", "analytics"), help="output directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="parallel worker processes")
+    args = parser.parse_args()
+
+    end_ts = args.end or (int(time.time()) // DAY + 1) * DAY
+    start_ts = args.start or end_ts - args.days * DAY
+    start_ts -= start_ts % DAY
+    days = list(range(start_ts, end_ts, DAY))
+    fmt = _output_format()
+
+    print(f"🚀 Analyzing {len(days)} day(s) with {args.workers} worker(s)...")
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(analyze_day, day, args.out, fmt) for day in days]
+        for future in as_completed(futures):
+            day_start, snapshots, written = future.result()
+            print(f"  {_day_name(day_start)}: {snapshots} snapshots, {len(written)} files")
+
+    print(f"🎉 Analytics written to {args.out}/")
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,14 @@ from etl.airports_etl import run_airport_etl
 from etl.flights_etl import run_flights_etl
 from etl.aircraft_etl import run_aircraft_etl
 from etl.delays_etl import run_delay_etl
+from streamlit_app.utils.refdata import export_airports
 
 def main():
     print("🚀 Running ETL Pipeline...")
 
     run_airport_etl()
+    # Publish the reloaded airports to every dashboard process
+    export_airports()
     run_flights_etl()
     run_aircraft_etl()
     run_delay_etl()
@@ -0,0 +1,59 @@
+import argparse
+from collections import defaultdict
+
+from streamlit_app.utils import db
+from streamlit_app.utils.indexes import RECOMMENDED_INDEXES, advise, apply, create_statement
+
+
+def _print_slow_queries(limit):
+    entries = db.read_slow_query_log()
+    if not entries:
+        print(f"No slow queries logged (threshold {db.SLOW_QUERY_MS:.0f} ms, log {db.SLOW_QUERY_LOG})")
+        return
+
+    # Group by statement text; report the worst by total time
+    grouped = defaultdict(list)
+    for entry in entries:
+        grouped[" ".join(entry["statement"].split())].append(entry)
+
+    worst = sorted(grouped.items(), key=lambda item: -sum(e["ms"] for e in item[1]))[:limit]
+    print(f"🐢 Slowest statements ({len(entries)} slow executions logged):")
+    for statement, runs in worst:
+        total = sum(e["ms"] for e in runs)
+        print(f"\n  {len(runs)}x, max {max(e['ms'] for e in runs):.0f} ms, total {total:.0f} ms")
+        print(f"  {statement[:300]}")
+        plan = next((e["plan"] for e in reversed(runs) if e.get("plan")), None)
+        if plan:
+            for line in plan.splitlines():
+                print(f"    | {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggest or create indexes for the dashboard's query patterns")
+    parser.add_argument("--apply", action="store_true", help="create the missing indexes")
+    parser.add_argument("--slow", type=int, default=10, help="show the N slowest logged statements (0 to skip)")
+    args = parser.parse_args()
+
+    print("🔍 Checking indexes...")
+    advice = advise()
+    for row in advice.itertuples(index=False):
+        print(f"  [{row.status:>8}] {row.table} ({row.columns}) — {row.serves}")
+
+    missing = advice[advice["status"] == "missing"]
+    if missing.empty:
+        print("✅ All recommended indexes are present")
+    elif args.apply:
+        created = apply(advice)
+        print(f"🎉 Created {len(created)} index(es): {', '.join(created)}")
+    else:
+        print("\nMissing indexes (run with --apply to create them):")
+        specs = {name: (table, columns) for name, table, columns, _ in RECOMMENDED_INDEXES}
+        for name in missing["index"]:
+            print(f"  {create_statement(name, *specs[name])};")
+
+    if args.slow:
+        print()
+        _print_slow_queries(args.slow)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import argparse
+import time
+from datetime import datetime, timezone
+
+from streamlit_app.utils import retention
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Downsample, expire and compact recorded position history")
+    parser.add_argument("--raw-days", type=int, default=retention.RAW_RETENTION_DAYS,
+                        help="days of full-resolution positions to keep")
+    parser.add_argument("--minute-days", type=int, default=retention.MINUTE_RETENTION_DAYS,
+                        help="days of per-minute positions to keep (0 keeps them forever)")
+    parser.add_argument("--compact", action="store_true", help="reclaim freed space and re-sort afterwards")
+    args = parser.parse_args()
+
+    print("🚀 Applying history retention...")
+
+    def progress(hour_start, rows):
+        hour = datetime.fromtimestamp(hour_start, tz=timezone.utc).strftime("%Y-%m-%d %H:00")
+        print(f"  {hour}: {rows} raw rows downsampled")
+
+    removed = retention.apply_retention(
+        int(time.time()), raw_days=args.raw_days, minute_days=args.minute_days, progress=progress
+    )
+    print(f"  {removed['raw']} raw rows moved to the minute tier, {removed['minute']} minute rows expired")
+
+    if args.compact:
+        print("🧹 Compacting storage...")
+        retention.compact()
+
+    print("🎉 Retention applied!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import argparse
+import time
+from datetime import datetime, timezone
+
+from streamlit_app.utils.rollups import backfill
+
+
+def _parse_date(value):
+    return int(datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill traffic rollup tables from position history")
+    parser.add_argument("--start", type=_parse_date, help="first day to rebuild (YYYY-MM-DD, UTC)")
+    parser.add_argument("--end", type=_parse_date, help="day after the last day to rebuild (YYYY-MM-DD, UTC)")
+    parser.add_argument("--days", type=int, default=30, help="rebuild the last N days when --start is omitted")
+    args = parser.parse_args()
+
+    end_ts = args.end or int(time.time())
+    start_ts = args.start or end_ts - args.days * 86400
+
+    print("🚀 Backfilling traffic rollups...")
+
+    def progress(day_start, snapshots):
+        day = datetime.fromtimestamp(day_start, tz=timezone.utc).strftime("%Y-%m-%d")
+        print(f"  {day}: {snapshots} snapshots replayed")
+
+    replayed = backfill(start_ts, end_ts, progress=progress)
+
+    print(f"🎉 Rollups rebuilt from {replayed} snapshots!")
+
+if __name__ == "__main__":
+    main()
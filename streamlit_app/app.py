@@ -16,8 +16,9 @@ from streamlit_app.pages import (
     airport_viewer,
     flight_search,
     delay_analysis,
-    live_map,        
+    live_map,
 )
+from streamlit_app.utils.cache import REGISTRY, cache_stats
 
 # Streamlit Page Configuration
 
@@ -67,6 +68,9 @@ with st.sidebar:
 
 # GLOBAL UI STYLING
 
+# One style block per full rerun; live sections refresh as fragments
+# and never re-run this part of the script.
+
 st.markdown(
     """
     <style>
@@ -74,21 +78,16 @@ st.markdown(
         padding-top: 1.5rem;
         padding-bottom: 1.5rem;
     }
+    .metric-card {
+        background: #f4f6f9;
+        padding: 15px;
+        border-radius: 12px;
+    }
     </style>
     """,
     unsafe_allow_html=True,
 )
 
-st.markdown("""
-<style>
-.metric-card {
-    background: #f4f6f9;
-    padding: 15px;
-    border-radius: 12px;
-}
-</style>
-""", unsafe_allow_html=True)
-
 
 
 # PAGE ROUTING
@@ -113,5 +112,9 @@ elif selected == "Live Map":
 
 with st.sidebar:
     st.markdown("---")
+    with st.expander("🧠 Cache Usage"):
+        stats = cache_stats()
+        st.caption(f"{REGISTRY.nbytes / 2**20:.1f} of {REGISTRY.budget_bytes / 2**20:.0f} MB budget")
+        st.dataframe(stats, use_container_width=True, hide_index=True)
     st.caption("© 2025 AeroDataBox Flight Explorer")
 
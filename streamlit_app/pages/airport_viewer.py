@@ -1,60 +1,27 @@
 import streamlit as st
 import pandas as pd
-import requests
+import time
+import plotly.express as px
 from st_aggrid import AgGrid, GridOptionsBuilder
 
+from streamlit_app.utils import refdata, rollups
+from streamlit_app.utils.cache import cached
+from streamlit_app.utils.live import LIVE_TTL, live_snapshot
+from streamlit_app.utils.tables import FrameSource, SnapshotSource, paged_table
 
-# OpenSky API
-
-OPENSKY_URL = "https://opensky-network.org/api/states/all"
 
 # Radius (degrees) for nearby aircraft
 AIRPORT_RADIUS = 1.0
 
 
-def fetch_live_aircraft():
-    """Fetch live aircraft over India"""
-    params = {
-        "lamin": 6.0,
-        "lamax": 35.0,
-        "lomin": 68.0,
-        "lomax": 97.0,
-    }
-
-    try:
-        r = requests.get(OPENSKY_URL, params=params, timeout=10)
-        if r.status_code != 200:
-            return pd.DataFrame()
-
-        data = r.json()
-        states = data.get("states", [])
-
-        if not states:
-            return pd.DataFrame()
-
-        df = pd.DataFrame(states, columns=[
-            "icao24","callsign","origin_country","time_position","last_contact",
-            "longitude","latitude","baro_altitude","on_ground","velocity",
-            "heading","vertical_rate","sensors","geo_altitude",
-            "squawk","spi","position_source"
-        ])
-
-        df = df.dropna(subset=["latitude", "longitude"])
-        return df
-
-    except Exception:
-        return pd.DataFrame()
-
-
 def aggrid_table(df, height=300):
+    # Rows arrive already paged by paged_table; the grid only shows them.
+    # Sorting/filtering live in paged_table's controls (server side), so
+    # the grid's own would only act on the current page.
     gb = GridOptionsBuilder.from_dataframe(df)
-    gb.configure_pagination(
-        paginationAutoPageSize=False,
-        paginationPageSize=15
-    )
     gb.configure_default_column(
-        filterable=True,
-        sortable=True,
+        filterable=False,
+        sortable=False,
         resizable=True
     )
     return AgGrid(
@@ -65,6 +32,69 @@ def aggrid_table(df, height=300):
     )
 
 
+@cached("airport_viewer.airport_traffic", ttl=300, max_entries=64)
+def _airport_traffic(iata_code, start_ts, end_ts):
+    return rollups.load_rollup("hour", "airport", start_ts, end_ts, keys=[iata_code])
+
+
+@st.fragment(run_every=LIVE_TTL)
+def _nearby_traffic(airport):
+    with st.spinner("Fetching live aircraft near airport..."):
+        snap = live_snapshot()
+
+    if snap.empty:
+        st.warning("Live aircraft data unavailable.")
+        return
+
+    # FILTER AIRCRAFT NEAR SELECTED AIRPORT
+
+    lat = snap.column("latitude")
+    lon = snap.column("longitude")
+    nearby = snap.filter(
+        (abs(lat - airport["latitude"]) <= AIRPORT_RADIUS) &
+        (abs(lon - airport["longitude"]) <= AIRPORT_RADIUS)
+    )
+
+    st.subheader(f"✈️ Live Aircraft Near {airport['iata_code']}")
+
+    c1, c2 = st.columns(2)
+    c1.metric("Nearby Aircraft", len(nearby))
+    c2.metric("Grounded Aircraft", int(nearby.column("on_ground").sum()))
+
+
+    # MAP VIEW
+
+    map_df = pd.concat([
+        pd.DataFrame({
+            "lat": [airport["latitude"]],
+            "lon": [airport["longitude"]],
+            "type": ["Airport"]
+        }),
+        pd.DataFrame({
+            "lat": nearby.column("latitude"),
+            "lon": nearby.column("longitude"),
+            "type": ["Aircraft"] * len(nearby)
+        })
+    ])
+
+    st.map(map_df.rename(columns={"lat": "latitude", "lon": "longitude"}))
+
+
+    # AIRCRAFT TABLE
+
+    with st.expander(" View Nearby Aircraft Details"):
+        paged_table(
+            SnapshotSource(nearby, {
+                "callsign": "callsign",
+                "origin_country": "origin_country",
+                "velocity": "velocity",
+                "geo_altitude": "geo_altitude",
+                "on_ground": "on_ground"
+            }),
+            key="airport_nearby"
+        )
+
+
 def show():
     st.title("🛫 Airport Explorer — India")
 
@@ -76,14 +106,7 @@ def show():
 
     # LOAD INDIAN AIRPORTS (FROM DB / OPENFLIGHTS)
 
-    from streamlit_app.utils.db import run_query
-
-    airports = run_query("""
-        SELECT iata_code, name, city, country, latitude, longitude
-        FROM airports
-        WHERE country = 'India'
-        ORDER BY name;
-    """)
+    airports = refdata.airports()
 
     if airports.empty:
         st.warning("No Indian airports found.")
@@ -93,7 +116,12 @@ def show():
     # AIRPORT TABLE
  
     st.subheader("🇮🇳 Indian Airports")
-    aggrid_table(airports, height=250)
+    paged_table(
+        FrameSource(airports),
+        key="airports",
+        page_size=25,
+        render=lambda page: aggrid_table(page, height=250)
+    )
 
 
     # AIRPORT SELECTOR
@@ -112,68 +140,30 @@ def show():
     c2.metric("City", airport["city"])
     c3.metric("IATA", airport["iata_code"])
 
-    st.markdown("---")
-
-    # FETCH LIVE AIRCRAFT
-
-    with st.spinner("Fetching live aircraft near airport..."):
-        live_df = fetch_live_aircraft()
-
-    if live_df.empty:
-        st.warning("Live aircraft data unavailable.")
-        return
-
-    # FILTER AIRCRAFT NEAR SELECTED AIRPORT
-
-    nearby = live_df[
-        (live_df["latitude"].between(
-            airport["latitude"] - AIRPORT_RADIUS,
-            airport["latitude"] + AIRPORT_RADIUS
-        )) &
-        (live_df["longitude"].between(
-            airport["longitude"] - AIRPORT_RADIUS,
-            airport["longitude"] + AIRPORT_RADIUS
-        ))
-    ]
-
-    st.subheader(f"✈️ Live Aircraft Near {airport['iata_code']}")
-
-    c1, c2 = st.columns(2)
-    c1.metric("Nearby Aircraft", len(nearby))
-    c2.metric("Grounded Aircraft", len(nearby[nearby["on_ground"] == True]))
+    # HOURLY TRAFFIC (FROM ROLLUPS)
 
+    # Round "now" to the hour so reruns hit the cache
+    now = int(time.time()) // 3600 * 3600 + 3600
+    try:
+        traffic = _airport_traffic(selected, now - 7 * 86400, now)
+    except Exception:
+        traffic = pd.DataFrame()
+
+    if not traffic.empty:
+        fig = px.line(
+            traffic,
+            x="time",
+            y="avg_aircraft",
+            title=f"Average Aircraft Near {selected} per Hour (Last 7 Days)",
+            labels={"time": "Time (UTC)", "avg_aircraft": "Aircraft"}
+        )
+        st.plotly_chart(fig, use_container_width=True)
 
-    # MAP VIEW
-
-    map_df = pd.concat([
-        pd.DataFrame({
-            "lat": [airport["latitude"]],
-            "lon": [airport["longitude"]],
-            "type": ["Airport"]
-        }),
-        pd.DataFrame({
-            "lat": nearby["latitude"],
-            "lon": nearby["longitude"],
-            "type": ["Aircraft"] * len(nearby)
-        })
-    ])
-
-    st.map(map_df.rename(columns={"lat": "latitude", "lon": "longitude"}))
-
+    st.markdown("---")
 
-    # AIRCRAFT TABLE
+    # LIVE TRAFFIC NEAR AIRPORT (REFRESHES ON ITS OWN)
 
-    with st.expander(" View Nearby Aircraft Details"):
-        st.dataframe(
-            nearby[[
-                "callsign",
-                "origin_country",
-                "velocity",
-                "geo_altitude",
-                "on_ground"
-            ]],
-            use_container_width=True
-        )
+    _nearby_traffic(airport)
 
 
     # FOOTNOTE
@@ -4,101 +4,74 @@ Derived from OpenSky Network live aircraft data
 """
 
 import streamlit as st
-import pandas as pd
-import requests
 import plotly.express as px
-from datetime import datetime
 
+from streamlit_app.utils import analytics, phases, refdata, sectors, tracks
+from streamlit_app.utils.cache import cached
+from streamlit_app.utils.live import LIVE_TTL, RECENT, live_snapshot
+from streamlit_app.utils.tables import FrameSource, paged_table
 
-# OpenSky India Bounding Box
 
-INDIA_BOUNDS = {
-    "lamin": 6.0,
-    "lamax": 35.0,
-    "lomin": 68.0,
-    "lomax": 97.0
-}
+@cached("delay_analysis.track_events", ttl=60, max_entries=4)
+def _track_events(snapshot_time):
+    """Holding / go-around events over the recent track window (per snapshot)."""
+    airports = refdata.coded_airports()
 
-OPEN_SKY_URL = "https://opensky-network.org/api/states/all"
-
-
-@st.cache_data(ttl=30)
-def fetch_live_opensky_data():
-    """Fetch live aircraft data over India from OpenSky"""
-    try:
-        r = requests.get(OPEN_SKY_URL, params=INDIA_BOUNDS, timeout=10)
-        if r.status_code != 200:
-            return pd.DataFrame(), None
-
-        data = r.json()
-        states = data.get("states", [])
-
-        if not states:
-            return pd.DataFrame(), None
-
-        df = pd.DataFrame(states, columns=[
-            "icao24","callsign","origin_country","time_position","last_contact",
-            "longitude","latitude","baro_altitude","on_ground","velocity",
-            "heading","vertical_rate","sensors","geo_altitude",
-            "squawk","spi","position_source"
-        ])
-
-        df = df.dropna(subset=["latitude", "longitude"])
-
-        df["velocity_kmh"] = df["velocity"] * 3.6
-        df["altitude_ft"] = df["geo_altitude"] * 3.28084
-        df["timestamp"] = datetime.utcfromtimestamp(data["time"])
-
-        return df, data["time"]
-
-    except Exception:
-        return pd.DataFrame(), None
-
-
-def show():
-    st.title("⏱️ Real-Time Delay Analysis — India")
-
-    st.info(
-        "This dashboard shows **real-time delay risk indicators** derived from live aircraft "
-        "behavior over India using the OpenSky Network free API.\n\n"
-        "**Note:** OpenSky does NOT provide actual delay minutes. "
-        "All delay insights are analytically derived from aircraft speed, altitude, "
-        "and ground status."
+    recent = tracks.Tracks(RECENT.window(tracks.TRACK_WINDOW_S))
+    return (
+        tracks.detect_holding(recent, airports),
+        tracks.detect_go_arounds(recent, airports),
     )
 
 
-    # FETCH LIVE DATA
-
+@st.fragment(run_every=LIVE_TTL)
+def _live_analysis():
     with st.spinner("Fetching live OpenSky aircraft data..."):
-        df, ts = fetch_live_opensky_data()
+        snap = live_snapshot()
 
-    if df.empty:
+    if snap.empty:
         st.warning("Live OpenSky data is currently unavailable.")
         return
 
-    # DERIVED DELAY INDICATORS
+    result = analytics.analyze_snapshot(snap, refdata.coded_airports())
+    codes = result["codes"]
 
-    grounded = df[df["on_ground"] == True]
-    slow_aircraft = df[df["velocity_kmh"] < 150]
-    low_altitude = df[df["altitude_ft"] < 3000]
+    df = snap.to_frame(["callsign", "origin_country", "on_ground"])
+    df["velocity_kmh"] = snap.column("velocity") * 3.6
+    df["altitude_ft"] = phases.altitude_m(
+        snap.column("geo_altitude"), snap.column("baro_altitude")
+    ) * 3.28084
+    df["phase"] = phases.PHASES[codes]
+
+    # DERIVED DELAY INDICATORS (FLIGHT PHASES)
+
+    counts = result["phase_counts"]
 
     # KPI METRICS
 
     c1, c2, c3, c4 = st.columns(4)
 
     c1.metric("✈️ Live Aircraft", len(df))
-    c2.metric("🛬 Grounded Aircraft", len(grounded))
-    c3.metric("🐢 Slow Aircraft (<150 km/h)", len(slow_aircraft))
-    c4.metric("📉 Low Altitude (<3000 ft)", len(low_altitude))
+    c2.metric("🚕 Taxiing", int(counts["taxi"]))
+    c3.metric("🛬 On Approach", int(counts["approach"]))
+    c4.metric("🅿️ Parked", int(counts["parked"]))
+
+    fig = px.bar(
+        counts.rename("aircraft").rename_axis("phase").reset_index(),
+        x="phase",
+        y="aircraft",
+        title="Aircraft by Flight Phase",
+        labels={"phase": "Phase", "aircraft": "Aircraft"}
+    )
+    st.plotly_chart(fig, use_container_width=True)
 
     st.markdown("---")
 
     # CONGESTION / DELAY RISK SCORE
 
-    congestion_score = round(
-        ((len(grounded) + len(slow_aircraft)) / max(len(df), 1)) * 100,
-        1
-    )
+    # Share of active terminal-area traffic that is queueing for a runway
+    congestion = result["congestion"]
+    congestion_score = result["congestion_score"]
 
     st.subheader("🚦 Live Delay Risk Indicator")
 
@@ -112,8 +85,64 @@ def show():
     else:
         st.success("Low congestion — operations normal.")
 
+    if not congestion.empty:
+        st.markdown("**Busiest Airports (within "
+                    f"{phases.TERMINAL_RADIUS_KM:.0f} km)**")
+        st.dataframe(
+            congestion.head(10)[
+                ["iata_code", "active", "taxi", "takeoff_roll", "approach",
+                 "climb", "descent", "congestion_score"]
+            ],
+            use_container_width=True,
+            hide_index=True
+        )
+
+    st.markdown("---")
+
+    # HOLDING PATTERNS & GO-AROUNDS (RECENT TRACKS)
+
+    st.subheader(f"🔁 Holding & Go-Arounds (Last {tracks.TRACK_WINDOW_S // 60} Minutes)")
+
+    holding, go_arounds = _track_events(snap.ts)
+
+    c1, c2 = st.columns(2)
+    c1.metric("🔁 Aircraft Holding", len(holding))
+    c2.metric("↗️ Go-Arounds", len(go_arounds))
+
+    if len(RECENT.window(tracks.TRACK_WINDOW_S)) < tracks.MIN_SAMPLES:
+        st.info("Collecting recent positions — track-based detection starts after a few polls.")
+    elif holding.empty and go_arounds.empty:
+        st.success("No holding patterns or go-arounds detected.")
+    else:
+        st.dataframe(
+            tracks.airport_event_counts(holding, go_arounds),
+            use_container_width=True,
+            hide_index=True
+        )
+
     st.markdown("---")
 
+    # AIRSPACE SECTOR OCCUPANCY
+
+    index = sectors.load_sectors()
+    if index is not None and len(index):
+        st.subheader("🧭 Airspace Sector Occupancy")
+
+        table = sectors.occupancy(index, snap)
+        recent = RECENT.window(tracks.TRACK_WINDOW_S)
+        if len(recent) >= 2:
+            moves = sectors.transitions(index, recent[-2], recent[-1])
+            table["entries"] = moves["entries"]
+            table["exits"] = moves["exits"]
+
+        st.dataframe(
+            table.sort_values("aircraft", ascending=False),
+            use_container_width=True,
+            hide_index=True
+        )
+
+        st.markdown("---")
+
     # SPEED VS ALTITUDE VISUALIZATION
 
     st.subheader(" Speed vs Altitude — Live Aircraft")
@@ -122,12 +151,12 @@ def show():
         df,
         x="velocity_kmh",
         y="altitude_ft",
-        color="on_ground",
+        color="phase",
         hover_data=["callsign", "origin_country"],
         labels={
             "velocity_kmh": "Speed (km/h)",
             "altitude_ft": "Altitude (ft)",
-            "on_ground": "On Ground"
+            "phase": "Phase"
         },
         title="Operational Delay Indicators from Live Air Traffic"
     )
@@ -137,20 +166,36 @@ def show():
     # LIVE AIRCRAFT TABLE (OPTIONAL)
 
     with st.expander(" View Live Aircraft Data"):
-        st.dataframe(
-            df[
+        paged_table(
+            FrameSource(df[
                 [
                     "callsign",
                     "origin_country",
                     "velocity_kmh",
                     "altitude_ft",
-                    "on_ground"
+                    "phase"
                 ]
-            ],
-            use_container_width=True
+            ]),
+            key="delay_live"
         )
 
-  
+
+def show():
+    st.title("⏱️ Real-Time Delay Analysis — India")
+
+    st.info(
+        "This dashboard shows **real-time delay risk indicators** derived from live aircraft "
+        "behavior over India using the OpenSky Network free API.\n\n"
+        "**Note:** OpenSky does NOT provide actual delay minutes. "
+        "All delay insights are analytically derived from flight phases inferred "
+        "from speed, altitude, vertical rate and distance to airports."
+    )
+
+
+    # LIVE ANALYSIS (REFRESHES ON ITS OWN)
+
+    _live_analysis()
+
     # FOOTNOTE
 
     st.caption(
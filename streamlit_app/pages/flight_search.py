@@ -1,54 +1,9 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import requests
-from datetime import datetime
 
-
-# INDIA BOUNDING BOX
-
-INDIA_BOUNDS = {
-    "lamin": 6.0,
-    "lamax": 35.0,
-    "lomin": 68.0,
-    "lomax": 97.0
-}
-
-OPEN_SKY_URL = "https://opensky-network.org/api/states/all"
-
-
-def fetch_live_flights():
-    """Fetch live flights over India from OpenSky"""
-    response = requests.get(
-        OPEN_SKY_URL,
-        params=INDIA_BOUNDS,
-        timeout=10
-    )
-
-    if response.status_code != 200:
-        return pd.DataFrame()
-
-    data = response.json()
-
-    if not data.get("states"):
-        return pd.DataFrame()
-
-    flights = []
-    for s in data["states"]:
-        flights.append({
-            "icao24": s[0],
-            "callsign": (s[1] or "").strip(),
-            "country": s[2],
-            "longitude": s[5],
-            "latitude": s[6],
-            "altitude_m": s[13],
-            "speed_mps": s[9],
-            "heading": s[10],
-            "on_ground": s[8],
-            "last_update": datetime.utcfromtimestamp(data["time"])
-        })
-
-    df = pd.DataFrame(flights)
-    return df.dropna(subset=["latitude", "longitude"])
+from streamlit_app.utils.live import live_snapshot
+from streamlit_app.utils.tables import SnapshotSource, paged_table
 
 
 def show():
@@ -82,45 +37,52 @@ def show():
             ["", "Airborne", "On Ground"]
         )
 
+    # Keep results on screen while the table's own controls rerun the page
     if st.button("🔍 Search Live Flights"):
+        st.session_state["flight_search_run"] = True
+
+    if st.session_state.get("flight_search_run"):
         with st.spinner("Fetching live aircraft over India..."):
-            df = fetch_live_flights()
+            snap = live_snapshot()
 
     
         # APPLY FILTERS
-    
+
+        mask = np.ones(len(snap), dtype=bool)
+
         if callsign:
-            df = df[df["callsign"].str.contains(callsign, case=False, na=False)]
+            callsigns = pd.Series(snap.column("callsign"))
+            mask &= callsigns.str.contains(callsign, case=False, na=False).to_numpy()
 
         if airline_country:
-            df = df[df["country"] == airline_country]
+            mask &= snap.where_string("origin_country", airline_country)
 
         if on_ground == "Airborne":
-            df = df[df["on_ground"] == False]
+            mask &= ~snap.column("on_ground")
 
         if on_ground == "On Ground":
-            df = df[df["on_ground"] == True]
+            mask &= snap.column("on_ground")
+
+        results = snap.filter(mask)
 
     
         # DISPLAY RESULTS
     
-        st.success(f"✈️ {len(df)} live flights found")
+        st.success(f"✈️ {len(results)} live flights found")
 
-        if df.empty:
+        if results.empty:
             st.warning("No live flights match your filters.")
             return
 
-        st.dataframe(
-            df[
-                [
-                    "callsign",
-                    "country",
-                    "latitude",
-                    "longitude",
-                    "altitude_m",
-                    "speed_mps",
-                    "on_ground",
-                ]
-            ],
-            use_container_width=True
+        paged_table(
+            SnapshotSource(results, {
+                "callsign": "callsign",
+                "origin_country": "country",
+                "latitude": "latitude",
+                "longitude": "longitude",
+                "geo_altitude": "altitude_m",
+                "velocity": "speed_mps",
+                "on_ground": "on_ground",
+            }),
+            key="flight_search_results"
         )
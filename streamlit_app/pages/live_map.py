@@ -1,108 +1,133 @@
 import streamlit as st
-import pandas as pd
 import pydeck as pdk
-import requests
-from datetime import datetime
 
+from streamlit_app.utils import density, deck_payload, refdata
+from streamlit_app.utils.cache import cached
+from streamlit_app.utils.live import LIVE_TTL, live_snapshot
+from streamlit_app.utils.tables import SnapshotSource, paged_table
 
-# OpenSky bounding box for INDIA
 
-# lat_min, lat_max, lon_min, lon_max
-INDIA_BOUNDS = (6.0, 35.0, 68.0, 97.0)
+# Columns shown in the table and map tooltips, renamed for display
+DISPLAY_COLUMNS = {
+    "callsign": "callsign",
+    "origin_country": "country",
+    "latitude": "latitude",
+    "longitude": "longitude",
+    "geo_altitude": "altitude_m",
+    "velocity": "velocity_mps",
+}
 
 
+@cached("live_map.density_pyramid", ttl=60, max_entries=4)
+def _density_pyramid(snapshot_time, _snap):
+    """Density pyramid for one snapshot, keyed on its timestamp."""
+    return density.build_pyramid(_snap.column("latitude"), _snap.column("longitude"))
 
-def fetch_live_aircraft():
-    """
-    Fetch live aircraft data inside India bounding box.
-    OpenSky API requires NO API KEY.
-    """
-    lat_min, lat_max, lon_min, lon_max = INDIA_BOUNDS
 
-    url = (
-        f"https://opensky-network.org/api/states/all?"
-        f"lamin={lat_min}&lamax={lat_max}&lomin={lon_min}&lomax={lon_max}"
-    )
-
-    response = requests.get(url)
+@cached("live_map.density_cells", ttl=60, max_entries=16)
+def _density_cells(snapshot_time, _snap, level):
+    cells = density.cell_layer_data(_density_pyramid(snapshot_time, _snap)[level], level)
+    return deck_payload.cell_records(cells)
 
-    if response.status_code != 200:
-        st.error("❌ Error fetching data from OpenSky API")
-        return pd.DataFrame()
 
-    data = response.json()
-
-    if "states" not in data or not data["states"]:
-        return pd.DataFrame()
+@cached("live_map.point_payload", ttl=60, max_entries=16)
+def _point_payload(snapshot_time, _snap, zoom, focus):
+    """Compact aircraft records in the viewport, built once per snapshot and view."""
+    center_lat, center_lon = _map_centers()[focus]
+    mask = density.viewport_mask(
+        _snap.column("latitude"), _snap.column("longitude"), center_lat, center_lon, zoom
+    )
+    visible = _snap.filter(mask).to_frame(list(DISPLAY_COLUMNS)).rename(columns=DISPLAY_COLUMNS)
+    return deck_payload.point_records(
+        visible, tooltip_fields=("callsign", "country", "altitude_m", "velocity_mps")
+    )
 
-    rows = []
-    for s in data["states"]:
-        rows.append({
-            "icao24": s[0],
-            "callsign": s[1],
-            "country": s[2],
-            "longitude": s[5],
-            "latitude": s[6],
-            "altitude_m": s[13],
-            "velocity_mps": s[9],
-            "heading_deg": s[10],
-            "timestamp": datetime.utcfromtimestamp(data["time"]).strftime("%Y-%m-%d %H:%M:%S")
-        })
 
-    df = pd.DataFrame(rows)
-    df = df.dropna(subset=["latitude", "longitude"])  
-    return df
+def _map_centers():
+    """Map centers offered in the selector: India plus each Indian airport."""
+    centers = {"India": (20.5937, 78.9629)}
+    airports = refdata.airports()
+    for a in airports[airports["iata_code"].notna()].itertuples():
+        centers[f"{a.iata_code} — {a.name}"] = (float(a.latitude), float(a.longitude))
+    return centers
 
 
-def show():
-    st.title("🗺️ Live Flight Map — (India Only)")
+@st.fragment(run_every=LIVE_TTL)
+def _live_table():
+    snap = live_snapshot()
 
-    st.info("Live aircraft positions are updated from OpenSky API every time you click refresh.")
+    st.subheader(f"✈️ Live Aircraft Count: {len(snap)}")
 
-    if st.button("🔄 Refresh Live Data"):
-        st.cache_data.clear()
-
-    @st.cache_data(ttl=20)  
-    def load_data():
-        return fetch_live_aircraft()
+    if snap.empty:
+        st.warning("No live aircraft found in the region right now.")
+        return
 
-    df = load_data()
+    paged_table(SnapshotSource(snap, DISPLAY_COLUMNS), key="live_map_table")
 
-    st.subheader(f"✈️ Live Aircraft Count: {len(df)}")
 
-    if df.empty:
-        st.warning("No live aircraft found in the region right now.")
+@st.fragment(run_every=LIVE_TTL)
+def _live_map_view():
+    snap = live_snapshot()
+    if snap.empty:
         return
 
-    # Display table
-    st.dataframe(df[["callsign", "country", "latitude", "longitude", "altitude_m", "velocity_mps"]])
+    # MAP VIEW CONTROLS
+
+    c1, c2 = st.columns([1, 2])
+    zoom = c1.slider("Map zoom", min_value=3, max_value=10, value=4)
+    focus = c2.selectbox("Center on", list(_map_centers()))
+    center_lat, center_lon = _map_centers()[focus]
 
+    level = density.level_for_zoom(zoom)
+    snapshot_time = snap.ts
 
     # PLOT ON MAP
 
-    layer = pdk.Layer(
-        "ScatterplotLayer",
-        df,
-        get_position="[longitude, latitude]",
-        get_color="[255, 0, 0]",
-        get_radius=25000,
-        pickable=True,
-    )
+    if level is None:
+        points = _point_payload(snapshot_time, snap, zoom, focus)
+        st.caption(f"Showing {len(points)} aircraft in view")
+
+        layer = pdk.Layer(
+            "ScatterplotLayer",
+            points,
+            get_position="p",
+            get_fill_color="c",
+            get_radius=2000,
+            radius_min_pixels=3,
+            pickable=True,
+        )
+
+        tooltip = {
+            "html": "<b>Callsign:</b> {callsign}<br/>"
+                    "<b>Country:</b> {country}<br/>"
+                    "<b>Altitude:</b> {altitude_m} m<br/>"
+                    "<b>Speed:</b> {velocity_mps} m/s<br/>"
+        }
+    else:
+        cells = _density_cells(snapshot_time, snap, level)
+        st.caption(
+            f"Showing aircraft density in {density.PYRAMID_LEVELS[level]}° cells "
+            f"— zoom to {density.POINT_ZOOM}+ for individual aircraft"
+        )
+
+        layer = pdk.Layer(
+            "PolygonLayer",
+            cells,
+            get_polygon="polygon",
+            get_fill_color="color",
+            stroked=False,
+            pickable=True,
+        )
+
+        tooltip = {"html": "<b>Aircraft:</b> {count}"}
 
     view_state = pdk.ViewState(
-        latitude=20.5937,  # Center of India
-        longitude=78.9629,
-        zoom=4.3,
+        latitude=center_lat,
+        longitude=center_lon,
+        zoom=zoom,
         pitch=30,
     )
 
-    tooltip = {
-        "html": "<b>Callsign:</b> {callsign}<br/>"
-                "<b>Country:</b> {country}<br/>"
-                "<b>Altitude:</b> {altitude_m} m<br/>"
-                "<b>Speed:</b> {velocity_mps} m/s<br/>"
-    }
-
     deck = pdk.Deck(
         layers=[layer],
         initial_view_state=view_state,
@@ -110,3 +135,20 @@ def show():
     )
 
     st.pydeck_chart(deck)
+
+
+def show():
+    st.title("🗺️ Live Flight Map — (India Only)")
+
+    st.info(
+        f"Live aircraft positions refresh from the OpenSky API every {LIVE_TTL} seconds, "
+        "or immediately when you click refresh."
+    )
+
+    if st.button("🔄 Refresh Live Data"):
+        # Only the live snapshot is refetched; other caches are keyed on it
+        live_snapshot.clear()
+
+    _live_table()
+
+    _live_map_view()
@@ -1,71 +1,35 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-import requests
+import time
 from datetime import datetime
 
+import numpy as np
 
-# OpenSky India Bounding Box
+from streamlit_app.utils import quality, rollups
+from streamlit_app.utils.cache import cached
+from streamlit_app.utils.live import LIVE_TTL, live_snapshot
+from streamlit_app.utils.tables import SnapshotSource, paged_table
 
-INDIA_BOUNDS = {
-    "lamin": 6.0,
-    "lamax": 35.0,
-    "lomin": 68.0,
-    "lomax": 97.0
-}
 
-OPEN_SKY_URL = "https://opensky-network.org/api/states/all"
+@cached("overview.rollups", ttl=60, max_entries=32)
+def _load_rollup(grain, dimension, start_ts, end_ts):
+    return rollups.load_rollup(grain, dimension, start_ts, end_ts)
 
 
-@st.cache_data(ttl=30)
-def fetch_live_states():
-    """Fetch live aircraft states over India"""
-    r = requests.get(OPEN_SKY_URL, params=INDIA_BOUNDS, timeout=10)
-    if r.status_code != 200:
-        return None, None
-
-    data = r.json()
-    states = data.get("states", [])
-
-    if not states:
-        return None, None
-
-    df = pd.DataFrame(states, columns=[
-        "icao24","callsign","origin_country","time_position","last_contact",
-        "longitude","latitude","baro_altitude","on_ground","velocity",
-        "heading","vertical_rate","sensors","geo_altitude",
-        "squawk","spi","position_source"
-    ])
-
-    df = df.dropna(subset=["latitude", "longitude"])
-    return df, data["time"]
-
-
-def show():
-    st.header("🌍 Live Air Traffic Overview — (India)")
-
-    st.info(
-        "This dashboard shows **REAL-TIME aircraft traffic over India** "
-        "using the OpenSky Network free API."
-    )
-
-
-    # FETCH LIVE DATA
-
+@st.fragment(run_every=LIVE_TTL)
+def _live_kpis():
     with st.spinner("Fetching live aircraft data..."):
-        df, ts = fetch_live_states()
+        snap = live_snapshot()
 
-    if df is None or df.empty:
+    if snap.empty:
         st.warning("Live OpenSky data unavailable.")
         return
 
-
-    # KPI METRICS (INDIA ONLY)
-
-    live_aircraft = len(df)
-    avg_speed = round(df["velocity"].mean() * 3.6, 1)  # km/h
-    avg_altitude = round(df["geo_altitude"].mean() * 3.28084, 0)  # ft
-    last_update = datetime.utcfromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+    live_aircraft = len(snap)
+    avg_speed = round(float(np.nanmean(snap.column("velocity"))) * 3.6, 1)  # km/h
+    avg_altitude = round(float(np.nanmean(snap.column("geo_altitude"))) * 3.28084, 0)  # ft
+    last_update = datetime.utcfromtimestamp(snap.ts).strftime("%Y-%m-%d %H:%M:%S")
 
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("✈️ Live Aircraft", live_aircraft)
@@ -73,48 +37,124 @@ def show():
     c3.metric("🛫 Avg Altitude (ft)", avg_altitude)
     c4.metric("🕒 Last Update (UTC)", last_update)
 
-    st.markdown("---")
+    report = quality.STATS.last
+    if report:
+        rejected = report["received"] - report["accepted"]
+        with st.expander(f"🧹 Data Quality — {rejected} of {report['received']} rows rejected in the last poll"):
+            reasons = list(quality.REJECT_REASONS + quality.FIX_REASONS)
+            st.dataframe(
+                pd.DataFrame({
+                    "check": reasons,
+                    "action": ["rejected"] * len(quality.REJECT_REASONS) + ["fixed"] * len(quality.FIX_REASONS),
+                    "last poll": [report[r] for r in reasons],
+                    f"all {quality.STATS.polls} polls": [quality.STATS.totals.get(r, 0) for r in reasons],
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
+
+
+@st.fragment
+def _traffic_trends():
+    st.subheader("📈 Aircraft Activity Over Time")
+
+    spans = {
+        "Last 6 hours": 6 * 3600,
+        "Last 24 hours": 86400,
+        "Last 7 days": 7 * 86400,
+        "Last 30 days": 30 * 86400,
+    }
+    span_label = st.radio("Range", list(spans), horizontal=True, index=1)
+    span = spans[span_label]
+    grain = rollups.grain_for_span(span)
+
+    # Round "now" to the minute so reruns within a minute hit the cache
+    now = int(time.time()) // 60 * 60 + 60
+    try:
+        traffic = _load_rollup(grain, "all", now - span, now)
+        countries = _load_rollup(grain, "country", now - span, now)
+    except Exception:
+        traffic = countries = pd.DataFrame()
+
+    if traffic.empty:
+        st.info("No recorded history yet — traffic trends appear once snapshots accumulate.")
+    else:
+        snapshots = traffic["snapshots"].clip(lower=1)
+        trend = pd.DataFrame({
+            "time": traffic["time"],
+            "Airborne": traffic["airborne"] / snapshots,
+            "On Ground": traffic["grounded"] / snapshots,
+        }).melt(id_vars="time", var_name="status", value_name="aircraft")
+
+        fig = px.area(
+            trend,
+            x="time",
+            y="aircraft",
+            color="status",
+            title=f"Average Aircraft per {grain.title()} — Airborne vs Grounded",
+            labels={"time": "Time (UTC)", "aircraft": "Aircraft"}
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        top = (
+            countries.groupby("key")["aircraft"].sum()
+            .div(traffic["snapshots"].sum())
+            .nlargest(10)
+            .rename("avg_aircraft")
+            .reset_index()
+        )
+        fig = px.bar(
+            top,
+            x="key",
+            y="avg_aircraft",
+            title=f"Top Origin Countries ({span_label})",
+            labels={"key": "Origin Country", "avg_aircraft": "Avg Aircraft"}
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment(run_every=LIVE_TTL)
+def _live_table():
+    snap = live_snapshot()
+    if snap.empty:
+        return
 
+    st.subheader("🧾 Live Aircraft Details (India)")
 
-    # FLIGHTS OVER TIME (LAST 30 SECONDS)
+    paged_table(
+        SnapshotSource(snap, {
+            "callsign": "callsign",
+            "origin_country": "origin_country",
+            "latitude": "latitude",
+            "longitude": "longitude",
+            "velocity": "velocity",
+            "geo_altitude": "geo_altitude",
+            "on_ground": "on_ground",
+        }),
+        key="overview_live"
+    )
 
-    st.subheader("📈 Aircraft Activity (Last 30 Seconds)")
 
-    # Simulate short-term trend
-    activity = df.copy()
-    activity["time"] = pd.to_datetime(ts, unit="s")
+def show():
+    st.header("🌍 Live Air Traffic Overview — (India)")
 
-    fig = px.histogram(
-        activity,
-        x="time",
-        nbins=10,
-        title="Live Aircraft Snapshot (Real-Time)",
-        labels={"time": "Timestamp"}
+    st.info(
+        "This dashboard shows **REAL-TIME aircraft traffic over India** "
+        "using the OpenSky Network free API."
     )
 
-    st.plotly_chart(fig, use_container_width=True)
 
-    st.markdown("---")
+    # LIVE KPIs, TRENDS AND TABLE (EACH REFRESHES ON ITS OWN)
+
+    _live_kpis()
 
+    st.markdown("---")
 
-    # LIVE DATA TABLE
+    _traffic_trends()
 
-    st.subheader("🧾 Live Aircraft Details (India)")
+    st.markdown("---")
 
-    st.dataframe(
-        df[
-            [
-                "callsign",
-                "origin_country",
-                "latitude",
-                "longitude",
-                "velocity",
-                "geo_altitude",
-                "on_ground",
-            ]
-        ],
-        use_container_width=True
-    )
+    _live_table()
 
 
     # FOOTNOTE (VERY IMPORTANT)
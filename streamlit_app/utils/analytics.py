@@ -0,0 +1,99 @@
+"""Per-snapshot analytics shared by the dashboard and batch jobs.
+
+The Delay Analysis page and ``run_analytics.py`` both call
+``analyze_snapshot`` so live and historical numbers come from the same
+code.
+"""
+import pandas as pd
+
+from streamlit_app.utils import phases
+
+
+def analyze_snapshot(snap, airports):
+    """Classify one snapshot and summarize it.
+
+    Returns a dict with:
+
+    * ``codes``, ``airport_index``, ``airport_km``: per-aircraft arrays
+    * ``phase_counts``: aircraft per phase (Series indexed by phase)
+    * ``congestion``: per-airport phase counts and congestion score
+    * ``congestion_score``: network-wide share of active terminal
+      traffic that is taxiing or on approach (percent)
+    """
+    codes, airport_idx, airport_km = phases.classify_snapshot(snap, airports)
+    congestion = phases.airport_congestion(codes, airport_idx, airport_km, airports)
+
+    queueing = congestion["taxi"].sum() + congestion["approach"].sum()
+    score = round(float(queueing) / max(float(congestion["active"].sum()), 1.0) * 100, 1)
+
+    return {
+        "codes": codes,
+        "airport_index": airport_idx,
+        "airport_km": airport_km,
+        "phase_counts": phases.phase_counts(codes),
+        "congestion": congestion,
+        "congestion_score": score,
+    }
+
+
+def summarize_history(positions, airports):
+    """Hourly phase statistics and airport traffic for recorded positions.
+
+    ``positions`` are ``position_history`` rows (any number of
+    snapshots). Returns ``(phase_stats, airport_traffic)`` frames with
+    one row per hour (and per airport): counts are averaged over every
+    snapshot in that hour, and congestion scores are recomputed from the
+    hour's summed counts.
+    """
+    from streamlit_app.utils.snapshot import Snapshot
+
+    phase_rows, airport_rows = [], []
+    for ts, group in positions.groupby("snapshot_ts", sort=True):
+        result = analyze_snapshot(Snapshot.from_frame(group, int(ts)), airports)
+
+        counts = result["phase_counts"].to_dict()
+        counts.update({
+            "snapshot_ts": int(ts),
+            "aircraft": len(group),
+            "congestion_score": result["congestion_score"],
+        })
+        phase_rows.append(counts)
+
+        congestion = result["congestion"].copy()
+        congestion["snapshot_ts"] = int(ts)
+        airport_rows.append(congestion)
+
+    if not phase_rows:
+        return pd.DataFrame(), pd.DataFrame()
+
+    phase_stats = pd.DataFrame(phase_rows)
+    phase_stats["hour"] = phase_stats["snapshot_ts"] // 3600 * 3600
+    snapshots = phase_stats.groupby("hour").size()
+
+    # Airports only appear in snapshots where they had traffic, so sum
+    # per hour and divide by every snapshot in that hour (as rollups do)
+    airport_traffic = pd.concat(airport_rows, ignore_index=True)
+    airport_traffic["hour"] = airport_traffic["snapshot_ts"] // 3600 * 3600
+    counts = list(phases.PHASES) + ["active"]
+    sums = airport_traffic.groupby(["hour", "iata_code"])[counts].sum()
+
+    # Ratios come from the summed counts, not an average of ratios
+    queueing = sums["taxi"] + sums["approach"]
+    sums["congestion_score"] = (queueing / sums["active"].clip(lower=1) * 100).round(1)
+    hourly = sums.groupby(level="hour")[["taxi", "approach", "active"]].sum()
+    network_score = ((hourly["taxi"] + hourly["approach"]) / hourly["active"].clip(lower=1) * 100).round(1)
+
+    per_snapshot = sums.index.get_level_values("hour").map(snapshots).to_numpy()
+    sums[counts] = sums[counts].div(per_snapshot, axis=0).round(2)
+    airport_traffic = sums.reset_index()
+    airport_traffic["hour"] = pd.to_datetime(airport_traffic["hour"], unit="s")
+
+    phase_stats = (
+        phase_stats.drop(columns=["snapshot_ts", "congestion_score"])
+        .groupby("hour").mean().round(2)
+    )
+    phase_stats["congestion_score"] = network_score.reindex(phase_stats.index, fill_value=0.0)
+    phase_stats = phase_stats.reset_index()
+    phase_stats["hour"] = pd.to_datetime(phase_stats["hour"], unit="s")
+
+    return phase_stats, airport_traffic
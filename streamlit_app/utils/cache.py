@@ -0,0 +1,260 @@
+"""Process-wide cache registry with a global memory budget.
+
+Every dashboard cache is declared with ``@cached(name, ttl=...)`` and
+lives in one registry shared by all sessions of the process. Entries
+are sized when stored (DataFrames deep, arrays by ``nbytes``, lists and
+dicts estimated from a sample of their elements), and when
+the total passes ``CACHE_BUDGET_MB`` the least recently used entry
+across *all* caches is evicted until it fits again, so many sessions
+and views can't grow the process without bound.
+
+Caches declared ``pinned=True`` (the live snapshot) count toward the
+budget but are never evicted for it; they only expire by TTL. Values
+larger than the whole budget are not stored; those refusals are counted
+and logged.
+
+Like ``st.cache_data``, arguments whose name starts with ``_`` are not
+part of the key. Unlike it, values are returned as-is (no pickled
+copy): treat them as read-only.
+"""
+import functools
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+CACHE_BUDGET_MB = float(os.getenv("CACHE_BUDGET_MB", "256"))
+
+# Concurrent misses on the same key compute once; keys share these locks
+LOCK_STRIPES = 16
+
+STAT_COLUMNS = ["cache", "entries", "bytes", "hits", "misses", "evictions", "expired", "refused"]
+
+logger = logging.getLogger(__name__)
+
+
+# Containers longer than this are sized from an evenly spaced sample
+SIZE_SAMPLE = 32
+
+
+def _sample(items):
+    """Up to ``SIZE_SAMPLE`` evenly spaced elements of a sized sequence."""
+    step = max(1, len(items) // SIZE_SAMPLE)
+    return items[::step][:SIZE_SAMPLE]
+
+
+def sizeof(value):
+    """Approximate memory held by ``value`` in bytes.
+
+    Lists, tuples, sets and dicts are estimated from a sample of their
+    elements, so sizing a payload stays cheap next to building it.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True, index=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict) and value:
+        keys = _sample(list(value))
+        per_item = sum(sizeof(k) + sizeof(value[k]) for k in keys) / len(keys)
+        return sys.getsizeof(value) + int(per_item * len(value))
+    if isinstance(value, (list, tuple, set, frozenset)) and value:
+        sample = _sample(value if isinstance(value, (list, tuple)) else list(value))
+        per_item = sum(sizeof(v) for v in sample) / len(sample)
+        return sys.getsizeof(value) + int(per_item * len(value))
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, (int, np.integer)):
+        return int(nbytes)
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    """Hashable stand-in for an argument value."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+class _Cache:
+    """One named cache: its LRU-ordered entries and counters."""
+
+    def __init__(self, name, ttl, max_entries, pinned=False):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.pinned = pinned
+        # key -> (value, nbytes, expires_at, last_used)
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.refused = 0
+        self._locks = [threading.RLock() for _ in range(LOCK_STRIPES)]
+
+    def lock_for(self, key):
+        return self._locks[hash(key) % LOCK_STRIPES]
+
+    def stats(self):
+        return (
+            self.name, len(self.entries), self.bytes, self.hits,
+            self.misses, self.evictions, self.expired, self.refused,
+        )
+
+
+class CacheRegistry:
+    """All named caches, evicted together against one byte budget."""
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = int(budget_bytes)
+        self._caches = {}
+        self._bytes = 0
+        self._tick = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def register(self, name, ttl=None, max_entries=None, pinned=False):
+        with self._lock:
+            if name not in self._caches:
+                self._caches[name] = _Cache(name, ttl, max_entries, pinned)
+            return self._caches[name]
+
+    def _drop(self, cache, key):
+        _, nbytes, _, _ = cache.entries.pop(key)
+        cache.bytes -= nbytes
+        self._bytes -= nbytes
+
+    def get(self, cache, key, count=True):
+        """``(True, value)`` on a live hit, else ``(False, None)``."""
+        with self._lock:
+            entry = cache.entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._drop(cache, key)
+                cache.expired += 1
+                entry = None
+
+            if entry is None:
+                cache.misses += count
+                return False, None
+
+            self._tick += 1
+            cache.entries[key] = (entry[0], entry[1], entry[2], self._tick)
+            cache.entries.move_to_end(key)
+            cache.hits += count
+            return True, entry[0]
+
+    def put(self, cache, key, value):
+        nbytes = sizeof(value)
+        if nbytes > self.budget_bytes and not cache.pinned:
+            # Would evict everything else and still not fit
+            with self._lock:
+                cache.refused += 1
+            logger.warning(
+                "Cache %s: %.1f MB value exceeds the %.0f MB budget; not cached",
+                cache.name, nbytes / 2**20, self.budget_bytes / 2**20,
+            )
+            return
+
+        with self._lock:
+            if key in cache.entries:
+                self._drop(cache, key)
+
+            expires = time.monotonic() + cache.ttl if cache.ttl else None
+            self._tick += 1
+            cache.entries[key] = (value, nbytes, expires, self._tick)
+            cache.bytes += nbytes
+            self._bytes += nbytes
+
+            if cache.max_entries and len(cache.entries) > cache.max_entries:
+                self._drop(cache, next(iter(cache.entries)))
+                cache.evictions += 1
+
+            while self._bytes > self.budget_bytes and self._evict_lru():
+                pass
+
+    def _evict_lru(self):
+        """Evict the globally least recently used unpinned entry, if any."""
+        # Each cache's first entry is its own LRU; the oldest of those goes
+        candidates = [c for c in self._caches.values() if c.entries and not c.pinned]
+        if not candidates:
+            return False
+        victim = min(candidates, key=lambda c: next(iter(c.entries.values()))[3])
+        self._drop(victim, next(iter(victim.entries)))
+        victim.evictions += 1
+        return True
+
+    def clear(self, cache=None):
+        with self._lock:
+            for c in [cache] if cache else list(self._caches.values()):
+                for key in list(c.entries):
+                    self._drop(c, key)
+
+    def stats(self):
+        """Per-cache entries, bytes, hits, misses, evictions, expirations and refusals."""
+        with self._lock:
+            rows = [c.stats() for c in self._caches.values()]
+        return pd.DataFrame(rows, columns=STAT_COLUMNS)
+
+
+REGISTRY = CacheRegistry(CACHE_BUDGET_MB * 1024 * 1024)
+
+
+def cached(name=None, ttl=None, max_entries=None, pinned=False):
+    """Memoize a function in ``REGISTRY``.
+
+    ``ttl`` is in seconds; ``max_entries`` optionally caps this cache on
+    top of the global byte budget. ``pinned`` exempts it from budget
+    eviction (for values with side effects on recompute). The wrapper
+    gains ``.clear()``.
+    """
+    def decorator(func):
+        cache = REGISTRY.register(
+            name or f"{func.__module__}.{func.__qualname__}", ttl, max_entries, pinned
+        )
+        signature = inspect.signature(func)
+        keyed = [p for p in signature.parameters if not p.startswith("_")]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(_freeze(bound.arguments[p]) for p in keyed)
+
+            hit, value = REGISTRY.get(cache, key)
+            if hit:
+                return value
+
+            with cache.lock_for(key):
+                # Another session may have filled it while we waited
+                hit, value = REGISTRY.get(cache, key, count=False)
+                if not hit:
+                    value = func(*args, **kwargs)
+                    REGISTRY.put(cache, key, value)
+            return value
+
+        wrapper.clear = lambda: REGISTRY.clear(cache)
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def cache_stats():
+    return REGISTRY.stats()
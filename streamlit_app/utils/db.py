@@ -3,9 +3,19 @@
 This module attempts to connect to Postgres using DB_URL from the
 .env file. If Postgres isn't available, it falls back to a local
 SQLite file so the UI remains usable for development.
+
+Every statement is timed; those slower than ``SLOW_QUERY_MS`` are kept
+in a slow-query log together with their ``EXPLAIN`` plan (see
+``slow_queries`` and ``run_index_advisor.py``).
 """
+import json
+import logging
 import os
-from sqlalchemy import create_engine, text, inspect
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import create_engine, event, text, inspect
 import pandas as pd
 from dotenv import load_dotenv
 
@@ -14,6 +24,31 @@ load_dotenv()
 # Primary DB URL (Postgres expected). Update via .env if different.
 DB_URL = os.getenv("DB_URL", "postgresql://localhost:5432/flightdb")
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Statements slower than this (milliseconds) are logged; negative disables.
+# Reads through ``run_query`` are timed including the row fetch (where
+# SQLite spends most of a large read); other statements are timed at the
+# cursor, i.e. execution only.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "250"))
+
+# Slow queries are appended here as JSON lines (empty disables the file)
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", os.path.join(PROJECT_ROOT, "data", "slow_queries.jsonl"))
+
+# Past this size the log is rotated to ``<log>.1`` (one old file is kept)
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(5 * 2**20)))
+
+# Statement types that can be EXPLAINed without side effects
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+logger = logging.getLogger(__name__)
+
+_slow_lock = threading.Lock()
+_slow_recent = deque(maxlen=200)
+
+# Statements executed by the current thread's ``run_query`` (None outside)
+_local = threading.local()
+
 
 def _create_engine_with_fallback(db_url: str):
     """Try to create an engine for `db_url`; on failure return a SQLite engine.
@@ -32,8 +67,96 @@ def _create_engine_with_fallback(db_url: str):
         return eng
 
 
+def _explain(cursor, dialect, statement, parameters):
+    """Plan for an already-executed statement, as text (or ``None``).
+
+    Runs on a raw DBAPI cursor of the same connection so it sees the
+    same transaction and doesn't re-enter the timing hooks. On Postgres
+    a failed EXPLAIN would abort the transaction, hence the savepoint.
+    """
+    if statement.lstrip().split(None, 1)[0].upper() not in _EXPLAINABLE:
+        return None
+
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    postgres = dialect == "postgresql"
+    raw = cursor.connection.cursor()
+    try:
+        if postgres:
+            raw.execute("SAVEPOINT slow_query_explain")
+        try:
+            raw.execute(prefix + statement, parameters)
+            rows = raw.fetchall()
+        except Exception:
+            if postgres:
+                raw.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return None
+        if postgres:
+            raw.execute("RELEASE SAVEPOINT slow_query_explain")
+    finally:
+        raw.close()
+
+    # Postgres: one text column per plan line; SQLite: detail is last
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def _record_slow_query(entry):
+    with _slow_lock:
+        _slow_recent.append(entry)
+        if SLOW_QUERY_LOG:
+            try:
+                os.makedirs(os.path.dirname(SLOW_QUERY_LOG), exist_ok=True)
+                if (
+                    os.path.exists(SLOW_QUERY_LOG)
+                    and os.path.getsize(SLOW_QUERY_LOG) >= SLOW_QUERY_LOG_MAX_BYTES
+                ):
+                    os.replace(SLOW_QUERY_LOG, SLOW_QUERY_LOG + ".1")
+                with open(SLOW_QUERY_LOG, "a") as f:
+                    f.write(json.dumps(entry) + "\n")
+            except OSError:
+                pass
+    logger.warning("Slow query (%.0f ms): %s", entry["ms"], " ".join(entry["statement"].split())[:200])
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    executed = getattr(_local, "executed", None)
+    if executed is not None:
+        # run_query times this one itself, fetch included
+        executed.append((statement, parameters))
+        return
+
+    elapsed_ms = (time.perf_counter() - context._query_start) * 1000
+    if SLOW_QUERY_MS < 0 or elapsed_ms < SLOW_QUERY_MS:
+        return
+
+    plan = None
+    if not executemany:
+        try:
+            plan = _explain(cursor, conn.dialect.name, statement, parameters)
+        except Exception:
+            plan = None
+
+    _record_slow_query({
+        "ts": int(time.time()),
+        "ms": round(elapsed_ms, 1),
+        "dialect": conn.dialect.name,
+        "statement": statement.strip(),
+        "executemany": bool(executemany),
+        "plan": plan,
+    })
+
+
+def _instrument(eng):
+    event.listen(eng, "before_cursor_execute", _before_execute)
+    event.listen(eng, "after_cursor_execute", _after_execute)
+    return eng
+
+
 # Engine the app will use (Postgres preferred, SQLite fallback)
-_engine = _create_engine_with_fallback(DB_URL)
+_engine = _instrument(_create_engine_with_fallback(DB_URL))
 engine = _engine
 
 
@@ -41,11 +164,45 @@ def get_engine():
     return _engine
 
 
+def _explain_detached(statement, parameters):
+    """Plan for ``statement`` on a fresh pooled connection (or ``None``)."""
+    raw = _engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        try:
+            return _explain(cursor, _engine.dialect.name, statement, parameters)
+        finally:
+            cursor.close()
+    except Exception:
+        return None
+    finally:
+        raw.close()
+
+
 def run_query(sql, params=None):
     if params is None:
         params = {}
-    with _engine.connect() as conn:
-        df = pd.read_sql(sql, conn, params=params)
+
+    _local.executed = []
+    start = time.perf_counter()
+    try:
+        with _engine.connect() as conn:
+            df = pd.read_sql(sql, conn, params=params)
+    finally:
+        executed, _local.executed = _local.executed, None
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if SLOW_QUERY_MS >= 0 and elapsed_ms >= SLOW_QUERY_MS and executed:
+        statement, parameters = executed[-1]
+        _record_slow_query({
+            "ts": int(time.time()),
+            "ms": round(elapsed_ms, 1),
+            "dialect": _engine.dialect.name,
+            "statement": statement.strip(),
+            "executemany": False,
+            "includes_fetch": True,
+            "plan": _explain_detached(statement, parameters),
+        })
     return df
 
 
@@ -58,6 +215,30 @@ def execute(sql, params=None):
             return None
 
 
+def slow_queries():
+    """Slow queries seen by this process, most recent last."""
+    with _slow_lock:
+        return list(_slow_recent)
+
+
+def read_slow_query_log(path=None):
+    """All slow queries in the log file (and its rotated predecessor)."""
+    path = path or SLOW_QUERY_LOG
+    if not path:
+        return []
+    entries = []
+    for name in (path + ".1", path):
+        if not os.path.exists(name):
+            continue
+        with open(name) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    return entries
+
+
 def check_schema():
     """Return a list of tables present in the connected database."""
     try:
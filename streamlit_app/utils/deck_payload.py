@@ -0,0 +1,58 @@
+"""Compact pydeck payloads for the live map.
+
+Passing a DataFrame to ``pdk.Layer`` serializes every column of every
+row (timestamps, unused fields, full float precision) as row-oriented
+JSON on each rerun. These helpers build the smallest payload a layer
+needs: only the accessed fields, positions rounded to float32-level
+precision, and colour / size attributes precomputed as small integers.
+
+``st.pydeck_chart`` always ships the deck as JSON (pydeck's binary
+transport only works inside Jupyter widgets), so trimming the JSON is
+the lever we have on the wire and in the browser's parser.
+"""
+import numpy as np
+
+
+# 4 decimals of a degree is ~11 m, about float32 precision at India longitudes
+POSITION_DECIMALS = 4
+
+# Altitude (m) -> colour ramp: low / ground traffic orange, cruise blue
+_ALT_MAX_M = 12000
+_COLOR_LOW = np.array([255, 140, 0], dtype="float32")
+_COLOR_HIGH = np.array([30, 90, 220], dtype="float32")
+
+
+def altitude_colors(altitude_m):
+    """RGB uint8 colour per aircraft from altitude (missing -> ground colour)."""
+    alt = np.nan_to_num(np.asarray(altitude_m, dtype="float32"), nan=0.0)
+    t = np.clip(alt / _ALT_MAX_M, 0.0, 1.0)[:, None]
+    return (_COLOR_LOW + (_COLOR_HIGH - _COLOR_LOW) * t).astype("uint8")
+
+
+def point_records(df, tooltip_fields=()):
+    """Row payload for a ``ScatterplotLayer``.
+
+    Each record carries ``p`` (``[lon, lat]``), ``c`` (RGB colour) and
+    the requested tooltip fields; nothing else from ``df`` is sent.
+    Use ``get_position="p"`` and ``get_fill_color="c"`` on the layer.
+    """
+    # Round in float64: float32 values print as long decimal noise in JSON
+    lon = np.round(df["longitude"].to_numpy(dtype="float64"), POSITION_DECIMALS)
+    lat = np.round(df["latitude"].to_numpy(dtype="float64"), POSITION_DECIMALS)
+    colors = altitude_colors(df["altitude_m"]).tolist()
+
+    columns = {"p": np.stack([lon, lat], axis=1).tolist(), "c": colors}
+    for field in tooltip_fields:
+        values = df[field]
+        if values.dtype.kind == "f":
+            # Tooltips show whole units; drop the float noise from the JSON
+            values = values.round(0).astype("Int64")
+        columns[field] = values.astype(object).where(values.notna(), None).tolist()
+
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def cell_records(cells):
+    """Row payload for a density ``PolygonLayer`` (``polygon``, ``count``, ``color``)."""
+    return cells[["polygon", "count", "color"]].to_dict("records")
@@ -0,0 +1,114 @@
+"""Server-side density binning for the live map.
+
+Aircraft positions are binned into a square degree grid at several zoom
+levels (a pyramid) once per snapshot. Zoomed-out maps draw one polygon
+per occupied cell, zoomed-in maps draw individual aircraft clipped to
+the viewport, so the payload sent to pydeck stays roughly constant as
+the number of aircraft grows.
+
+Cell sizes halve at every level and are aligned at (0, 0), so each
+coarse cell is exactly four finer cells and coarser levels are built by
+re-aggregating the finer one instead of re-binning every point.
+"""
+import numpy as np
+import pandas as pd
+
+
+# Map zoom -> grid cell size in degrees
+PYRAMID_LEVELS = {
+    3: 2.0,
+    4: 1.0,
+    5: 0.5,
+    6: 0.25,
+}
+
+# From this zoom on the map shows individual aircraft
+POINT_ZOOM = 7
+
+# Approximate rendered map size in pixels, used to derive the viewport
+MAP_WIDTH_PX = 1200
+MAP_HEIGHT_PX = 500
+
+# Light -> dark red ramp for cell fill
+_COLOR_LOW = np.array([255, 220, 160])
+_COLOR_HIGH = np.array([200, 0, 0])
+
+
+def build_pyramid(lat, lon):
+    """Bin positions into every pyramid level.
+
+    Returns ``{zoom: DataFrame[cell_x, cell_y, count]}``.
+    """
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+
+    zooms = sorted(PYRAMID_LEVELS, reverse=True)
+    finest = PYRAMID_LEVELS[zooms[0]]
+
+    cells = pd.DataFrame({
+        "cell_x": np.floor(lon / finest).astype("int64"),
+        "cell_y": np.floor(lat / finest).astype("int64"),
+    })
+    level = cells.groupby(["cell_x", "cell_y"]).size().rename("count").reset_index()
+
+    pyramid = {zooms[0]: level}
+    for zoom in zooms[1:]:
+        # Floor division keeps negative indices aligned with np.floor
+        level = (
+            level.assign(cell_x=level["cell_x"] // 2, cell_y=level["cell_y"] // 2)
+            .groupby(["cell_x", "cell_y"], as_index=False)["count"].sum()
+        )
+        pyramid[zoom] = level
+
+    return pyramid
+
+
+def level_for_zoom(zoom):
+    """Pyramid level to draw at ``zoom`` (``None`` means draw aircraft)."""
+    if zoom >= POINT_ZOOM:
+        return None
+    return min(max(int(zoom), min(PYRAMID_LEVELS)), max(PYRAMID_LEVELS))
+
+
+def cell_layer_data(level, zoom):
+    """Turn one pyramid level into polygon rows for a ``PolygonLayer``."""
+    size = PYRAMID_LEVELS[zoom]
+    x0 = level["cell_x"].to_numpy() * size
+    y0 = level["cell_y"].to_numpy() * size
+    x1, y1 = x0 + size, y0 + size
+
+    counts = level["count"].to_numpy()
+    scale = np.log1p(counts) / np.log1p(max(counts.max(), 1)) if len(counts) else counts
+    colors = (_COLOR_LOW + (_COLOR_HIGH - _COLOR_LOW) * scale[:, None]).astype(int)
+
+    return pd.DataFrame({
+        "polygon": [
+            [[a, b], [c, b], [c, d], [a, d]]
+            for a, b, c, d in zip(x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist())
+        ],
+        "count": counts,
+        "color": [c + [180] for c in colors.tolist()],
+    })
+
+
+def viewport_bounds(center_lat, center_lon, zoom):
+    """Approximate ``(lat_min, lat_max, lon_min, lon_max)`` visible at ``zoom``."""
+    deg_per_px = 360.0 / (256 * 2 ** zoom)
+    half_w = deg_per_px * MAP_WIDTH_PX / 2
+    # Web Mercator stretches latitude less than longitude near India
+    half_h = deg_per_px * MAP_HEIGHT_PX / 2 * np.cos(np.radians(center_lat))
+    return (
+        center_lat - half_h,
+        center_lat + half_h,
+        center_lon - half_w,
+        center_lon + half_w,
+    )
+
+
+def viewport_mask(lat, lon, center_lat, center_lon, zoom):
+    """Boolean mask of positions inside the visible viewport."""
+    lat_min, lat_max, lon_min, lon_max = viewport_bounds(center_lat, center_lon, zoom)
+    return (
+        (lat >= lat_min) & (lat <= lat_max) &
+        (lon >= lon_min) & (lon <= lon_max)
+    )
@@ -0,0 +1,154 @@
+"""Recorded position history.
+
+Each live snapshot a dashboard process polls (see ``live``) is appended
+to ``position_history`` exactly once, and the traffic rollups are
+updated in the same step. Nothing else records snapshots, so history
+and rollups only advance while some dashboard session is polling. Timestamps are stored as integer epoch
+seconds so the same SQL works on Postgres and the SQLite fallback.
+"""
+import pandas as pd
+from sqlalchemy import text
+
+from streamlit_app.utils.db import get_engine, run_query
+
+
+HISTORY_TABLE = "position_history"
+
+# Columns persisted per aircraft per snapshot
+HISTORY_COLUMNS = [
+    "icao24", "callsign", "origin_country", "longitude", "latitude",
+    "baro_altitude", "geo_altitude", "on_ground", "velocity",
+    "heading", "vertical_rate",
+]
+
+_tables_ready = False
+
+
+def ensure_history_tables():
+    """Create the history and snapshot log tables if they are missing."""
+    global _tables_ready
+    if _tables_ready:
+        return
+
+    with get_engine().begin() as conn:
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {HISTORY_TABLE} (
+                snapshot_ts INTEGER NOT NULL,
+                icao24 TEXT NOT NULL,
+                callsign TEXT,
+                origin_country TEXT,
+                longitude REAL,
+                latitude REAL,
+                baro_altitude REAL,
+                geo_altitude REAL,
+                on_ground BOOLEAN,
+                velocity REAL,
+                heading REAL,
+                vertical_rate REAL
+            )
+        """))
+        conn.execute(text(f"""
+            CREATE INDEX IF NOT EXISTS ix_{HISTORY_TABLE}_ts
+            ON {HISTORY_TABLE} (snapshot_ts)
+        """))
+        # One row per snapshot that has been ingested; guards against the
+        # same OpenSky snapshot being recorded by several pages/processes.
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS snapshot_log (
+                snapshot_ts INTEGER PRIMARY KEY,
+                aircraft INTEGER NOT NULL
+            )
+        """))
+
+    _tables_ready = True
+
+
+def record_snapshot(df, ts):
+    """Persist a snapshot and fold it into the rollups.
+
+    Returns ``True`` if the snapshot was new, ``False`` if ``ts`` had
+    already been recorded (or there was nothing to record).
+    """
+    from streamlit_app.utils import rollups
+
+    if ts is None or df is None or df.empty:
+        return False
+
+    ensure_history_tables()
+    rollups.ensure_rollup_tables()
+
+    rows = df.reindex(columns=HISTORY_COLUMNS)
+    rows = rows.astype(object).where(rows.notna(), None)
+    rows.insert(0, "snapshot_ts", int(ts))
+
+    with get_engine().begin() as conn:
+        claimed = conn.execute(
+            text("""
+                INSERT INTO snapshot_log (snapshot_ts, aircraft)
+                VALUES (:ts, :n)
+                ON CONFLICT (snapshot_ts) DO NOTHING
+            """),
+            {"ts": int(ts), "n": len(df)},
+        ).rowcount
+        if not claimed:
+            return False
+
+        cols = ", ".join(rows.columns)
+        binds = ", ".join(f":{c}" for c in rows.columns)
+        conn.execute(
+            text(f"INSERT INTO {HISTORY_TABLE} ({cols}) VALUES ({binds})"),
+            rows.to_dict("records"),
+        )
+        rollups.apply_snapshot(conn, df, ts)
+
+    return True
+
+
+def load_history(start_ts, end_ts, columns=None):
+    """Return recorded positions with ``start_ts <= snapshot_ts < end_ts``.
+
+    The part of the range older than the raw retention horizon is read
+    from the per-minute downsampled tier (see ``retention``).
+    """
+    from streamlit_app.utils import retention
+
+    ensure_history_tables()
+    start_ts, end_ts = int(start_ts), int(end_ts)
+    horizon = retention.raw_horizon()
+
+    ranges = []
+    if start_ts < horizon:
+        ranges.append((retention.DOWNSAMPLED_TABLE, start_ts, min(end_ts, horizon)))
+    if end_ts > horizon:
+        ranges.append((HISTORY_TABLE, max(start_ts, horizon), end_ts))
+
+    cols = ", ".join(["snapshot_ts"] + list(columns or HISTORY_COLUMNS))
+    frames = [
+        run_query(
+            text(f"""
+                SELECT {cols}
+                FROM {table}
+                WHERE snapshot_ts >= :start AND snapshot_ts < :end
+                ORDER BY snapshot_ts
+            """),
+            {"start": start, "end": end},
+        )
+        for table, start, end in ranges
+    ]
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def snapshot_times(start_ts, end_ts):
+    """Return the recorded snapshot timestamps in ``[start_ts, end_ts)``."""
+    ensure_history_tables()
+    df = run_query(
+        text("""
+            SELECT snapshot_ts FROM snapshot_log
+            WHERE snapshot_ts >= :start AND snapshot_ts < :end
+            ORDER BY snapshot_ts
+        """),
+        {"start": int(start_ts), "end": int(end_ts)},
+    )
+    return df["snapshot_ts"].astype("int64").tolist()
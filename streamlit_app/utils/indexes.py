@@ -0,0 +1,98 @@
+"""Index advisor for the dashboard's query patterns.
+
+``RECOMMENDED_INDEXES`` lists the indexes the app's queries rely on.
+``advise`` compares them against what the connected database (Postgres
+or SQLite) actually has: an index counts as present if any existing
+index, primary key or unique constraint starts with the same columns.
+``apply`` creates the missing ones with ``CREATE INDEX IF NOT EXISTS``.
+"""
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from streamlit_app.utils.db import get_engine
+from streamlit_app.utils.history import HISTORY_TABLE
+from streamlit_app.utils.retention import DOWNSAMPLED_TABLE
+from streamlit_app.utils.rollups import GRAINS, rollup_table
+
+
+# (index name, table, columns, query pattern it serves)
+RECOMMENDED_INDEXES = [
+    (
+        "ix_airports_country_name", "airports", ("country", "name"),
+        "airports WHERE country = ... ORDER BY name (refdata export)",
+    ),
+    (
+        f"ix_{HISTORY_TABLE}_ts", HISTORY_TABLE, ("snapshot_ts",),
+        "position history time-range scans (analytics, rollup backfill)",
+    ),
+    (
+        f"ix_{DOWNSAMPLED_TABLE}_ts", DOWNSAMPLED_TABLE, ("snapshot_ts",),
+        "downsampled history time-range scans beyond raw retention",
+    ),
+    (
+        "ix_snapshot_log_ts", "snapshot_log", ("snapshot_ts",),
+        "snapshot_log time-range scans",
+    ),
+] + [
+    (
+        f"ix_{rollup_table(grain)}_key", rollup_table(grain), ("dimension", "key", "bucket"),
+        "rollups for one airport/country over a time range",
+    )
+    for grain in GRAINS
+]
+
+ADVICE_COLUMNS = ["index", "table", "columns", "serves", "status"]
+
+
+def _existing(inspector, table):
+    """Column tuples of every index-like structure on ``table``."""
+    found = []
+    pk = inspector.get_pk_constraint(table).get("constrained_columns") or []
+    if pk:
+        found.append(tuple(pk))
+    for index in inspector.get_indexes(table):
+        found.append(tuple(c for c in index["column_names"] if c))
+    for unique in inspector.get_unique_constraints(table):
+        found.append(tuple(unique["column_names"]))
+    return found
+
+
+def _covered(columns, existing):
+    return any(found[:len(columns)] == tuple(columns) for found in existing)
+
+
+def advise():
+    """Status of each recommended index: ``present``, ``missing`` or ``no table``."""
+    inspector = inspect(get_engine())
+    tables = set(inspector.get_table_names())
+
+    rows = []
+    cache = {}
+    for name, table, columns, serves in RECOMMENDED_INDEXES:
+        if table not in tables:
+            status = "no table"
+        else:
+            if table not in cache:
+                cache[table] = _existing(inspector, table)
+            status = "present" if _covered(columns, cache[table]) else "missing"
+        rows.append((name, table, ", ".join(columns), serves, status))
+
+    return pd.DataFrame(rows, columns=ADVICE_COLUMNS)
+
+
+def create_statement(name, table, columns):
+    return f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+
+
+def apply(advice=None):
+    """Create every missing recommended index; returns the names created."""
+    advice = advise() if advice is None else advice
+    missing = set(advice.loc[advice["status"] == "missing", "index"])
+
+    created = []
+    with get_engine().begin() as conn:
+        for name, table, columns, _ in RECOMMENDED_INDEXES:
+            if name in missing:
+                conn.execute(text(create_statement(name, table, columns)))
+                created.append(name)
+    return created
@@ -0,0 +1,79 @@
+"""Live snapshot source shared by every page.
+
+The latest OpenSky poll is fetched once per TTL per process, recorded to
+history, and returned as the same ``Snapshot`` object to every page and
+session (the cache registry hands out the object itself rather than
+a pickled copy). Recent snapshots are also kept in ``RECENT`` for
+analyses that need short tracks.
+
+Each poll goes through ``quality.validate`` first, so every consumer
+sees de-duplicated rows with stale and impossible positions removed.
+
+A snapshot that fails to record (e.g. the database is locked by a
+rollup backfill) is logged and retried on the next poll.
+"""
+import logging
+from collections import deque
+
+from streamlit_app.utils import quality
+from streamlit_app.utils.cache import cached
+from streamlit_app.utils.history import HISTORY_COLUMNS, record_snapshot
+from streamlit_app.utils.opensky import fetch_states
+from streamlit_app.utils.snapshot import Snapshot, SnapshotHistory
+
+
+# Seconds between OpenSky polls
+LIVE_TTL = 20
+
+# How much snapshot history to keep in RAM
+RECENT_SECONDS = 3 * 3600
+
+RECENT = SnapshotHistory(max_age=RECENT_SECONDS)
+
+# Unrecorded snapshots kept for retry (oldest dropped first)
+MAX_PENDING = 30
+
+logger = logging.getLogger(__name__)
+
+_pending = deque()
+
+
+def _record_pending():
+    """Record queued snapshots oldest first; stop at the first failure."""
+    while _pending:
+        snap = _pending[0]
+        try:
+            record_snapshot(snap.to_frame(HISTORY_COLUMNS), snap.ts)
+        except Exception:
+            logger.warning(
+                "Recording snapshot %s failed; %d snapshot(s) queued for retry",
+                snap.ts, len(_pending), exc_info=True,
+            )
+            break
+        _pending.popleft()
+
+    while len(_pending) > MAX_PENDING:
+        logger.error("Dropping unrecorded snapshot %s", _pending.popleft().ts)
+
+
+# Pinned: an early eviction would re-poll OpenSky and re-run validation
+# and recording for what should be one poll per TTL
+@cached("live_snapshot", ttl=LIVE_TTL, max_entries=1, pinned=True)
+def live_snapshot():
+    """Latest live snapshot over India (empty snapshot if OpenSky is down)."""
+    df, ts = fetch_states()
+
+    if ts is None:
+        return Snapshot.blank()
+
+    # Validate before anything sees the snapshot; rejected rows never
+    # reach the pages, RECENT or history
+    snap, report = quality.validate(Snapshot.from_frame(df, ts), previous=RECENT.latest())
+    quality.STATS.record(report)
+    RECENT.append(snap)
+
+    # History/rollups must not stop the live view from rendering
+    _pending.append(snap)
+    _record_pending()
+
+    return snap
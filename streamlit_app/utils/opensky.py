@@ -1,110 +1,53 @@
-import streamlit as st
+"""OpenSky Network client shared by the dashboard pages and batch jobs.
+
+Every page used to carry its own copy of the request/parse code. This
+module fetches a state vector snapshot once and returns it with the
+full OpenSky column layout so callers can pick what they need.
+"""
 import pandas as pd
-import pydeck as pdk
 import requests
-from datetime import datetime
-
-# ------------------------
-# OpenSky bounding box for INDIA
-# ------------------------
-# lat_min, lat_max, lon_min, lon_max
-INDIA_BOUNDS = (6.0, 35.0, 68.0, 97.0)
-
-def fetch_live_aircraft():
-    """
-    Fetch live aircraft data inside India bounding box.
-    OpenSky API requires NO API KEY.
-    """
-    lat_min, lat_max, lon_min, lon_max = INDIA_BOUNDS
-
-    url = (
-        f"https://opensky-network.org/api/states/all?"
-        f"lamin={lat_min}&lamax={lat_max}&lomin={lon_min}&lomax={lon_max}"
-    )
-
-    response = requests.get(url)
-
-    if response.status_code != 200:
-        st.error("❌ Error fetching data from OpenSky API")
-        return pd.DataFrame()
 
-    data = response.json()
 
-    if "states" not in data or not data["states"]:
-        return pd.DataFrame()
+# OpenSky India Bounding Box
 
-    rows = []
-    for s in data["states"]:
-        rows.append({
-            "icao24": s[0],
-            "callsign": s[1],
-            "country": s[2],
-            "longitude": s[5],
-            "latitude": s[6],
-            "altitude_m": s[13],
-            "velocity_mps": s[9],
-            "heading_deg": s[10],
-            "timestamp": datetime.utcfromtimestamp(data["time"]).strftime("%Y-%m-%d %H:%M:%S")
-        })
+INDIA_BOUNDS = {
+    "lamin": 6.0,
+    "lamax": 35.0,
+    "lomin": 68.0,
+    "lomax": 97.0
+}
 
-    df = pd.DataFrame(rows)
-    df = df.dropna(subset=["latitude", "longitude"])  # Clean
-    return df
+OPEN_SKY_URL = "https://opensky-network.org/api/states/all"
 
+# Column order of a state vector in the /states/all response
+STATE_COLUMNS = [
+    "icao24", "callsign", "origin_country", "time_position", "last_contact",
+    "longitude", "latitude", "baro_altitude", "on_ground", "velocity",
+    "heading", "vertical_rate", "sensors", "geo_altitude",
+    "squawk", "spi", "position_source"
+]
 
-def show():
-    st.title("🗺️ Live Flight Map — OpenSky (India Only)")
 
-    st.info("Live aircraft positions are updated from OpenSky API every time you click refresh.")
+def fetch_states(bounds=None, timeout=10):
+    """Fetch one snapshot of live aircraft states.
 
-    if st.button("🔄 Refresh Live Data"):
-        st.cache_data.clear()
-
-    @st.cache_data(ttl=20)  # refresh every 20 seconds
-    def load_data():
-        return fetch_live_aircraft()
-
-    df = load_data()
-
-    st.subheader(f"✈️ Live Aircraft Count: {len(df)}")
-
-    if df.empty:
-        st.warning("No live aircraft found in the region right now.")
-        return
-
-    # Display table
-    st.dataframe(df[["callsign", "country", "latitude", "longitude", "altitude_m", "velocity_mps"]])
-
-    # --------------------------
-    # PLOT ON MAP
-    # --------------------------
-    layer = pdk.Layer(
-        "ScatterplotLayer",
-        df,
-        get_position="[longitude, latitude]",
-        get_color="[255, 0, 0]",
-        get_radius=25000,
-        pickable=True,
-    )
+    Returns ``(df, ts)`` where ``ts`` is the OpenSky snapshot time in
+    epoch seconds. On any failure an empty frame and ``None`` are
+    returned so pages can show a warning instead of crashing.
+    """
+    try:
+        r = requests.get(OPEN_SKY_URL, params=bounds or INDIA_BOUNDS, timeout=timeout)
+        if r.status_code != 200:
+            return pd.DataFrame(columns=STATE_COLUMNS), None
 
-    view_state = pdk.ViewState(
-        latitude=20.5937,  # Center of India
-        longitude=78.9629,
-        zoom=4.3,
-        pitch=30,
-    )
+        data = r.json()
+        states = data.get("states") or []
 
-    tooltip = {
-        "html": "<b>Callsign:</b> {callsign}<br/>"
-                "<b>Country:</b> {country}<br/>"
-                "<b>Altitude:</b> {altitude_m} m<br/>"
-                "<b>Speed:</b> {velocity_mps} m/s<br/>"
-    }
+        if not states:
+            return pd.DataFrame(columns=STATE_COLUMNS), None
 
-    deck = pdk.Deck(
-        layers=[layer],
-        initial_view_state=view_state,
-        tooltip=tooltip,
-    )
+        # Rows without a position are dropped (and counted) by quality.validate
+        return pd.DataFrame(states, columns=STATE_COLUMNS), int(data["time"])
 
-    st.pydeck_chart(deck)
+    except Exception:
+        return pd.DataFrame(columns=STATE_COLUMNS), None
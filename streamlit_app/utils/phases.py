@@ -0,0 +1,165 @@
+"""Vectorized flight-phase classification.
+
+Each aircraft in a snapshot is labelled with one phase from its speed,
+altitude, vertical rate, ground flag and distance to the nearest
+airport. Everything is NumPy array arithmetic (no per-row Python), so a
+10k-aircraft snapshot classifies in a few milliseconds.
+
+Thresholds are deliberately coarse; OpenSky altitudes are above mean
+sea level, not above the runway, so "low" is relative to Indian
+airfield elevations (mostly under 1000 m).
+"""
+import numpy as np
+import pandas as pd
+
+
+PHASES = np.array([
+    "parked",
+    "taxi",
+    "takeoff_roll",
+    "climb",
+    "cruise",
+    "descent",
+    "approach",
+])
+
+PARKED, TAXI, TAKEOFF_ROLL, CLIMB, CRUISE, DESCENT, APPROACH = range(len(PHASES))
+
+# Ground speed limits (m/s): ~5 kt parked, ~50 kt taxi
+PARKED_MAX_MPS = 2.5
+TAXI_MAX_MPS = 26.0
+
+# Vertical rate (m/s) beyond which the aircraft is climbing/descending (~300 ft/min)
+LEVEL_MAX_VRATE = 1.5
+
+# Approach: descending, low, and close to an airport
+APPROACH_MAX_ALT_M = 1500.0
+APPROACH_MAX_KM = 30.0
+
+# Aircraft within this distance of an airport count toward its congestion
+TERMINAL_RADIUS_KM = 40.0
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def _unit_vectors(lat, lon):
+    lat = np.radians(np.asarray(lat, dtype="float32"))
+    lon = np.radians(np.asarray(lon, dtype="float32"))
+    coslat = np.cos(lat)
+    return np.stack([coslat * np.cos(lon), coslat * np.sin(lon), np.sin(lat)], axis=1)
+
+
+def nearest_airport_km(lat, lon, airport_lat, airport_lon):
+    """Index of and great-circle distance (km) to the nearest airport.
+
+    Positions become unit vectors, so the nearest airport is the one
+    with the largest dot product: a single matrix multiply instead of
+    per-pair trigonometry.
+    """
+    n = len(lat)
+    if len(airport_lat) == 0 or n == 0:
+        return np.full(n, -1, dtype="int32"), np.full(n, np.inf, dtype="float32")
+
+    p = _unit_vectors(lat, lon)
+    q = _unit_vectors(airport_lat, airport_lon)
+
+    idx = (p @ q.T).argmax(axis=1).astype("int32")
+
+    # float32 dot products lose precision at short range; measure the
+    # chosen pair exactly with haversine (one pair per aircraft)
+    km = haversine_km(
+        lat, lon,
+        np.asarray(airport_lat, dtype="float64")[idx],
+        np.asarray(airport_lon, dtype="float64")[idx],
+    )
+    return idx, km.astype("float32")
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Element-wise great-circle distance in km."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype="float64")) for a in (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2 +
+        np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def altitude_m(geo_altitude, baro_altitude):
+    """Geometric altitude, falling back to barometric where it is missing."""
+    geo = np.asarray(geo_altitude, dtype="float32")
+    return np.where(np.isnan(geo), np.asarray(baro_altitude, dtype="float32"), geo)
+
+
+def classify(velocity, altitude, vertical_rate, on_ground, airport_km):
+    """Return an int8 phase code per aircraft (index into ``PHASES``)."""
+    v = np.nan_to_num(np.asarray(velocity, dtype="float32"), nan=0.0)
+    alt = np.asarray(altitude, dtype="float32")
+    vr = np.nan_to_num(np.asarray(vertical_rate, dtype="float32"), nan=0.0)
+    ground = np.asarray(on_ground, dtype=bool)
+    km = np.asarray(airport_km, dtype="float32")
+
+    descending = vr < -LEVEL_MAX_VRATE
+    conditions = [
+        ground & (v < PARKED_MAX_MPS),
+        ground & (v < TAXI_MAX_MPS),
+        ground,
+        descending & (alt < APPROACH_MAX_ALT_M) & (km <= APPROACH_MAX_KM),
+        vr > LEVEL_MAX_VRATE,
+        descending,
+    ]
+    choices = [PARKED, TAXI, TAKEOFF_ROLL, APPROACH, CLIMB, DESCENT]
+    return np.select(conditions, choices, default=CRUISE).astype("int8")
+
+
+def classify_snapshot(snap, airports):
+    """Classify a ``Snapshot`` against an airports frame.
+
+    Returns ``(phase_codes, airport_index, airport_km)``; ``airport_index``
+    is a row position in ``airports`` (-1 if there are none).
+    """
+    lat = snap.column("latitude")
+    lon = snap.column("longitude")
+    idx, km = nearest_airport_km(
+        lat, lon,
+        airports["latitude"].to_numpy(dtype="float32"),
+        airports["longitude"].to_numpy(dtype="float32"),
+    )
+    codes = classify(
+        snap.column("velocity"),
+        altitude_m(snap.column("geo_altitude"), snap.column("baro_altitude")),
+        snap.column("vertical_rate"),
+        snap.column("on_ground"),
+        km,
+    )
+    return codes, idx, km
+
+
+def phase_counts(codes):
+    """Count of aircraft per phase, in ``PHASES`` order."""
+    return pd.Series(np.bincount(codes, minlength=len(PHASES)), index=PHASES)
+
+
+def airport_congestion(codes, airport_index, airport_km, airports):
+    """Per-airport phase counts and congestion score for terminal traffic.
+
+    The score is the share of active (non-parked) terminal-area aircraft
+    that are taxiing or on approach, i.e. queueing for a runway.
+    """
+    near = (airport_index >= 0) & (airport_km <= TERMINAL_RADIUS_KM)
+    if not near.any():
+        return pd.DataFrame(columns=["iata_code", *PHASES, "active", "congestion_score"])
+
+    n_airports = len(airports)
+    flat = airport_index[near].astype("int64") * len(PHASES) + codes[near]
+    counts = np.bincount(flat, minlength=n_airports * len(PHASES)).reshape(n_airports, len(PHASES))
+
+    table = pd.DataFrame(counts, columns=PHASES)
+    table.insert(0, "iata_code", airports["iata_code"].to_numpy())
+    table["active"] = table[list(PHASES)].sum(axis=1) - table["parked"]
+    table["congestion_score"] = (
+        (table["taxi"] + table["approach"]) / table["active"].clip(lower=1) * 100
+    ).round(1)
+
+    table = table[table[list(PHASES)].sum(axis=1) > 0]
+    return table.sort_values(["active", "congestion_score"], ascending=False, ignore_index=True)
@@ -0,0 +1,160 @@
+"""Data-quality and de-duplication stage for ingested snapshots.
+
+``validate`` runs once per OpenSky poll, between parsing and anything
+that consumes the snapshot (pages, ``RECENT``, history). It works on the
+snapshot's structured array with a handful of vectorized passes (one
+sort for duplicates, one binary search against the previous snapshot
+for jumps), so it adds a few milliseconds for thousands of aircraft,
+small next to fetching and parsing the payload.
+
+Rows are rejected for:
+
+* ``no_position``: missing or out-of-range latitude/longitude
+* ``bad_icao24``: transponder address that didn't parse (or is all zeros)
+* ``stale_position``: ``time_position`` more than ``STALE_POSITION_S``
+  behind ``last_contact``
+* ``duplicate``: repeated ``icao24`` (the most recent contact is kept)
+* ``teleport``: implied ground speed from the aircraft's previous
+  position above ``MAX_SPEED_MPS``
+
+and fixed in place (counted, not dropped) for:
+
+* ``altitude_filled``: ``geo_altitude`` missing or implausible, replaced
+  by ``baro_altitude``
+* ``missing_callsign``: blank callsign (kept as missing)
+"""
+import threading
+
+import numpy as np
+
+from streamlit_app.utils.phases import haversine_km
+from streamlit_app.utils.snapshot import MISSING_CODE, MISSING_TIME, Snapshot
+
+
+# Position older than this relative to the last contact is stale (seconds)
+STALE_POSITION_S = 60
+
+# Faster than any airliner (~780 kt); anything above is a bad fix
+MAX_SPEED_MPS = 400.0
+# Allowance for position quantization over short intervals
+TELEPORT_SLACK_KM = 2.0
+
+# Plausible altitude range (m, above mean sea level)
+MIN_ALTITUDE_M = -500.0
+MAX_ALTITUDE_M = 20000.0
+
+REJECT_REASONS = ("no_position", "bad_icao24", "stale_position", "duplicate", "teleport")
+FIX_REASONS = ("altitude_filled", "missing_callsign")
+
+
+def _plausible_altitude(values):
+    return np.isfinite(values) & (values >= MIN_ALTITUDE_M) & (values <= MAX_ALTITUDE_M)
+
+
+def _teleports(rows, ts, previous):
+    """Mask of rows whose jump from ``previous`` is physically impossible."""
+    jumped = np.zeros(len(rows), dtype=bool)
+    if previous is None or previous.empty or previous.ts is None or ts is None:
+        return jumped
+
+    prev = previous.rows
+    order = np.argsort(prev["icao24"], kind="stable")
+    prev_icao = prev["icao24"][order]
+
+    pos = np.searchsorted(prev_icao, rows["icao24"])
+    pos = np.minimum(pos, len(prev_icao) - 1)
+    seen = prev_icao[pos] == rows["icao24"]
+    if not seen.any():
+        return jumped
+
+    match = np.flatnonzero(seen)
+    before = order[pos[match]]
+
+    # Time between fixes; fall back to the snapshot interval
+    tp_now = rows["time_position"][match].astype("int64")
+    tp_before = prev["time_position"][before].astype("int64")
+    dt = (tp_now - tp_before).astype("float64")
+    dt[(tp_now == MISSING_TIME) | (tp_before == MISSING_TIME) | (dt <= 0)] = float(ts - previous.ts)
+
+    km = haversine_km(
+        prev["latitude"][before], prev["longitude"][before],
+        rows["latitude"][match], rows["longitude"][match],
+    )
+    limit_km = np.maximum(dt, 0.0) * MAX_SPEED_MPS / 1000.0 + TELEPORT_SLACK_KM
+    jumped[match] = km > limit_km
+    return jumped
+
+
+def validate(snap, previous=None):
+    """Clean one freshly parsed snapshot.
+
+    ``previous`` is the last accepted snapshot (for the teleport check).
+    Returns ``(clean_snapshot, report)`` where ``report`` maps every
+    reason in ``REJECT_REASONS`` and ``FIX_REASONS`` to a row count, plus
+    ``received`` and ``accepted``.
+    """
+    rows = snap.rows.copy()
+    report = dict.fromkeys(REJECT_REASONS + FIX_REASONS, 0)
+    report["received"] = len(rows)
+
+    if len(rows) == 0:
+        report["accepted"] = 0
+        return Snapshot(rows, snap.ts), report
+
+    # Fixes first, so later checks and consumers see filled values
+    geo, baro = rows["geo_altitude"], rows["baro_altitude"]
+    bad_geo = ~_plausible_altitude(geo)
+    fill = bad_geo & _plausible_altitude(baro)
+    geo[fill] = baro[fill]
+    geo[bad_geo & ~fill] = np.nan
+    baro[~_plausible_altitude(baro)] = np.nan
+    report["altitude_filled"] = int(fill.sum())
+    report["missing_callsign"] = int((rows["callsign"] == MISSING_CODE).sum())
+
+    lat, lon = rows["latitude"], rows["longitude"]
+    rejected = np.zeros(len(rows), dtype=bool)
+
+    def reject(reason, mask):
+        new = mask & ~rejected
+        report[reason] = int(new.sum())
+        rejected[new] = True
+
+    reject("no_position", ~(np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) <= 90) & (np.abs(lon) <= 180)))
+    reject("bad_icao24", rows["icao24"] == 0)
+
+    tp, lc = rows["time_position"], rows["last_contact"]
+    known = (tp != MISSING_TIME) & (lc != MISSING_TIME)
+    reject("stale_position", known & (lc.astype("int64") - tp.astype("int64") > STALE_POSITION_S))
+
+    # Keep the latest contact per icao24 among the surviving rows
+    order = np.lexsort((-tp.astype("int64"), -lc.astype("int64"), rejected, rows["icao24"]))
+    icao_sorted = rows["icao24"][order]
+    repeat = np.zeros(len(rows), dtype=bool)
+    repeat[order[1:]] = icao_sorted[1:] == icao_sorted[:-1]
+    reject("duplicate", repeat)
+
+    reject("teleport", _teleports(rows, snap.ts, previous))
+
+    clean = rows[~rejected]
+    report["accepted"] = len(clean)
+    return Snapshot(clean, snap.ts), report
+
+
+class QualityStats:
+    """Last and cumulative validation reports for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.last = None
+        self.totals = {}
+        self.polls = 0
+
+    def record(self, report):
+        with self._lock:
+            self.last = dict(report)
+            self.polls += 1
+            for reason, count in report.items():
+                self.totals[reason] = self.totals.get(reason, 0) + count
+
+
+STATS = QualityStats()
@@ -0,0 +1,260 @@
+"""Memory-mapped reference datasets shared by all Streamlit processes.
+
+Reference tables (airports today, aircraft metadata later) are exported
+once into a versioned directory of ``.npy`` column files. Every process
+maps the columns read-only with ``np.load(mmap_mode="r")``, so the OS
+page cache holds a single copy no matter how many workers run.
+
+Layout under ``REFDATA_DIR``::
+
+    airports.current            -> text file naming the live version
+    airports-<version>/meta.json
+    airports-<version>/<column>.npy
+
+An export writes a new version directory and then swaps the pointer
+file with ``os.replace``, which is atomic, so readers see either the old
+or the new dataset and never a partial one. Exports of the same table
+are serialized with a lock file, and pruning never removes the version
+the pointer names.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: exports are not serialized across processes
+    fcntl = None
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REFDATA_DIR = os.getenv("REFDATA_DIR", os.path.join(PROJECT_ROOT, "data", "refdata"))
+
+# Versions kept on disk per table (the live one plus the previous one)
+KEEP_VERSIONS = 2
+
+AIRPORT_COLUMNS = ["iata_code", "name", "city", "country", "latitude", "longitude"]
+
+_lock = threading.Lock()
+_open_tables = {}
+
+
+class RefTable:
+    """A read-only, memory-mapped reference table."""
+
+    def __init__(self, name, version, columns):
+        self.name = name
+        self.version = version
+        self._columns = columns
+
+    def __len__(self):
+        return len(next(iter(self._columns.values()))) if self._columns else 0
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def column(self, name):
+        """Zero-copy, read-only view of one column."""
+        return self._columns[name]
+
+    def to_frame(self, columns=None):
+        """Build a DataFrame; numeric columns stay backed by the mapping."""
+        names = columns or self.columns
+        data = {}
+        for name in names:
+            values = self._columns[name]
+            if values.dtype.kind == "U":
+                strings = values.astype(object)
+                strings[values == ""] = None
+                values = strings
+            data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+
+def _pointer_path(name):
+    return os.path.join(REFDATA_DIR, f"{name}.current")
+
+
+def _version_dir(name, version):
+    return os.path.join(REFDATA_DIR, f"{name}-{version}")
+
+
+def _to_array(series):
+    if series.dtype.kind in "fiub":
+        return series.to_numpy()
+    # Fixed-width unicode keeps strings mappable (object arrays are not)
+    return series.fillna("").astype(str).to_numpy(dtype=str)
+
+
+class _ExportLock:
+    """Exclusive cross-process lock on ``<name>.lock`` in ``REFDATA_DIR``."""
+
+    def __init__(self, name):
+        self._path = os.path.join(REFDATA_DIR, f"{name}.lock")
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self._path, "a")
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+
+def export_table(name, df):
+    """Write ``df`` as a new version of ``name`` and make it current."""
+    os.makedirs(REFDATA_DIR, exist_ok=True)
+
+    with _ExportLock(name):
+        return _export_locked(name, df)
+
+
+def _export_if_missing(name, load):
+    """Export ``load()`` as ``name`` unless some process already has.
+
+    The pointer is re-checked under the export lock, so workers starting
+    cold together publish one version instead of one each.
+    """
+    os.makedirs(REFDATA_DIR, exist_ok=True)
+
+    with _ExportLock(name):
+        version = current_version(name)
+        if version is None:
+            version = _export_locked(name, load())
+        return version
+
+
+def _export_locked(name, df):
+    version = str(time.time_ns())
+    target = _version_dir(name, version)
+    staging = target + ".tmp"
+    os.makedirs(staging)
+
+    meta = {"name": name, "version": version, "rows": len(df), "columns": {}}
+    for column in df.columns:
+        values = _to_array(df[column])
+        np.save(os.path.join(staging, f"{column}.npy"), values, allow_pickle=False)
+        meta["columns"][column] = values.dtype.str
+
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    os.rename(staging, target)
+
+    pointer_tmp = _pointer_path(name) + f".{version}.tmp"
+    with open(pointer_tmp, "w") as f:
+        f.write(version)
+    os.replace(pointer_tmp, _pointer_path(name))
+
+    _prune_versions(name)
+    return version
+
+
+def _prune_versions(name):
+    prefix = f"{name}-"
+    live = current_version(name)
+    versions = sorted(
+        d[len(prefix):] for d in os.listdir(REFDATA_DIR)
+        if d.startswith(prefix) and not d.endswith(".tmp")
+    )
+    # Already-mapped files stay valid after unlink on POSIX
+    for version in versions[:-KEEP_VERSIONS]:
+        if version != live:
+            shutil.rmtree(_version_dir(name, version), ignore_errors=True)
+
+
+def current_version(name):
+    """Version string the pointer file names, or ``None`` if never exported."""
+    try:
+        with open(_pointer_path(name)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def open_table(name):
+    """Return the current version of ``name`` (``None`` if not exported).
+
+    The mapping is reused until the pointer names a new version, so the
+    per-call cost is one small file read. If the named version can't be
+    read, the previous mapping is kept (``None`` if there is none).
+    """
+    version = current_version(name)
+    if version is None:
+        return None
+
+    table = _open_tables.get(name)
+    if table is not None and table.version == version:
+        return table
+
+    with _lock:
+        table = _open_tables.get(name)
+        if table is not None and table.version == version:
+            return table
+
+        directory = _version_dir(name, version)
+        try:
+            with open(os.path.join(directory, "meta.json")) as f:
+                meta = json.load(f)
+
+            columns = {
+                column: np.load(os.path.join(directory, f"{column}.npy"), mmap_mode="r")
+                for column in meta["columns"]
+            }
+        except (OSError, ValueError):
+            return table
+        table = RefTable(name, version, columns)
+        _open_tables[name] = table
+        return table
+
+
+def _query_airports():
+    from streamlit_app.utils.db import run_query
+
+    return run_query("""
+        SELECT iata_code, name, city, country, latitude, longitude
+        FROM airports
+        WHERE country = 'India'
+        ORDER BY name;
+    """)
+
+
+def export_airports():
+    """Export Indian airports from the database; returns the new version."""
+    return export_table("airports", _query_airports())
+
+
+def airports():
+    """Indian airports (sorted by name) as a DataFrame.
+
+    Exports from the database the first time if no process has yet.
+    Returns an empty frame if neither the file nor the table exists.
+    """
+    table = open_table("airports")
+    if table is None:
+        try:
+            _export_if_missing("airports", _query_airports)
+        except Exception:
+            return pd.DataFrame(columns=AIRPORT_COLUMNS)
+        table = open_table("airports")
+        if table is None:
+            return pd.DataFrame(columns=AIRPORT_COLUMNS)
+
+    return table.to_frame(AIRPORT_COLUMNS)
+
+
+def coded_airports():
+    """Airports that have an IATA code, positionally indexed from 0."""
+    df = airports()
+    return df[df["iata_code"].notna()].reset_index(drop=True)
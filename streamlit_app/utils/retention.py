@@ -0,0 +1,221 @@
+"""Tiered retention for recorded position history.
+
+* Raw snapshots stay in ``position_history`` for ``RAW_RETENTION_DAYS``.
+* Older positions are downsampled to one point per aircraft per minute
+  (the last sample in that minute) in ``position_history_minute``, kept
+  for ``MINUTE_RETENTION_DAYS`` (0 keeps them forever) together with the
+  minute rollups.
+* Hour and day rollups are never pruned.
+
+``raw_horizon`` is the boundary between the tiers: ``load_history``
+reads the downsampled table below it, and ``rollups.backfill`` never
+rebuilds buckets below it (the raw rows they came from are gone).
+``compact`` reclaims the space left by deletes and (on Postgres)
+rewrites the downsampled tier in time order. On SQLite that tier is a
+``WITHOUT ROWID`` table, which is always stored in key (time) order.
+"""
+import os
+
+import pandas as pd
+from sqlalchemy import text
+
+from streamlit_app.utils.db import get_engine, run_query
+from streamlit_app.utils.history import HISTORY_COLUMNS, HISTORY_TABLE, ensure_history_tables
+
+
+DOWNSAMPLED_TABLE = "position_history_minute"
+
+RAW_RETENTION_DAYS = int(os.getenv("RAW_RETENTION_DAYS", "7"))
+MINUTE_RETENTION_DAYS = int(os.getenv("MINUTE_RETENTION_DAYS", "90"))
+
+DAY = 86400
+# Raw rows are downsampled an hour at a time to bound memory
+CHUNK_SECONDS = 3600
+
+_tables_ready = False
+
+
+def ensure_retention_tables():
+    """Create the downsampled tier and the horizon bookkeeping table."""
+    global _tables_ready
+    if _tables_ready:
+        return
+
+    ensure_history_tables()
+    engine = get_engine()
+    # SQLite stores a WITHOUT ROWID table as a B-tree on its primary key,
+    # keeping the tier clustered by (snapshot_ts, icao24)
+    clustered = " WITHOUT ROWID" if engine.dialect.name == "sqlite" else ""
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {DOWNSAMPLED_TABLE} (
+                snapshot_ts INTEGER NOT NULL,
+                icao24 TEXT NOT NULL,
+                callsign TEXT,
+                origin_country TEXT,
+                longitude REAL,
+                latitude REAL,
+                baro_altitude REAL,
+                geo_altitude REAL,
+                on_ground BOOLEAN,
+                velocity REAL,
+                heading REAL,
+                vertical_rate REAL,
+                PRIMARY KEY (snapshot_ts, icao24)
+            ){clustered}
+        """))
+        # Everything below ``horizon`` has left the tier
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS retention_state (
+                tier TEXT PRIMARY KEY,
+                horizon INTEGER NOT NULL
+            )
+        """))
+
+    _tables_ready = True
+
+
+def horizon(tier):
+    """Epoch seconds below which ``tier`` holds no data (0 if never pruned)."""
+    ensure_retention_tables()
+    df = run_query(text("SELECT horizon FROM retention_state WHERE tier = :tier"), {"tier": tier})
+    return int(df["horizon"].iloc[0]) if not df.empty else 0
+
+
+def raw_horizon():
+    return horizon("raw")
+
+
+def _set_horizon(conn, tier, ts):
+    conn.execute(
+        text("""
+            INSERT INTO retention_state (tier, horizon) VALUES (:tier, :ts)
+            ON CONFLICT (tier) DO UPDATE SET horizon = excluded.horizon
+            WHERE excluded.horizon > retention_state.horizon
+        """),
+        {"tier": tier, "ts": int(ts)},
+    )
+
+
+def downsample(positions):
+    """Last position per aircraft per minute, sorted by ``(snapshot_ts, icao24)``.
+
+    ``snapshot_ts`` is floored to the minute.
+    """
+    minute = positions["snapshot_ts"].astype("int64") // 60 * 60
+    rows = positions.assign(snapshot_ts=minute, _ts=positions["snapshot_ts"])
+    rows = rows.sort_values(["snapshot_ts", "icao24", "_ts"], kind="stable")
+    rows = rows.drop_duplicates(["snapshot_ts", "icao24"], keep="last")
+    return rows.drop(columns="_ts").reset_index(drop=True)
+
+
+def _insert_downsampled(conn, rows):
+    rows = rows.reindex(columns=["snapshot_ts"] + HISTORY_COLUMNS)
+    rows = rows.astype(object).where(rows.notna(), None)
+    cols = ", ".join(rows.columns)
+    binds = ", ".join(f":{c}" for c in rows.columns)
+    conn.execute(
+        text(f"""
+            INSERT INTO {DOWNSAMPLED_TABLE} ({cols}) VALUES ({binds})
+            ON CONFLICT (snapshot_ts, icao24) DO NOTHING
+        """),
+        rows.to_dict("records"),
+    )
+
+
+def _raw_range(start_ts, end_ts):
+    return run_query(
+        text(f"""
+            SELECT snapshot_ts, {', '.join(HISTORY_COLUMNS)}
+            FROM {HISTORY_TABLE}
+            WHERE snapshot_ts >= :start AND snapshot_ts < :end
+        """),
+        {"start": int(start_ts), "end": int(end_ts)},
+    )
+
+
+def downsample_raw(cutoff_ts, progress=None):
+    """Move raw positions older than ``cutoff_ts`` into the minute tier.
+
+    ``cutoff_ts`` is floored to a whole day. Each hour is downsampled and
+    deleted from the raw table in one transaction, so an interrupted run
+    simply resumes. Returns the number of raw rows removed.
+    """
+    ensure_retention_tables()
+    cutoff_ts = int(cutoff_ts) - int(cutoff_ts) % DAY
+
+    oldest = run_query(text(f"SELECT MIN(snapshot_ts) AS ts FROM {HISTORY_TABLE}"))["ts"].iloc[0]
+    removed = 0
+    if pd.notna(oldest) and int(oldest) < cutoff_ts:
+        start = int(oldest) - int(oldest) % CHUNK_SECONDS
+        for chunk in range(start, cutoff_ts, CHUNK_SECONDS):
+            positions = _raw_range(chunk, chunk + CHUNK_SECONDS)
+            if positions.empty:
+                continue
+
+            with get_engine().begin() as conn:
+                _insert_downsampled(conn, downsample(positions))
+                conn.execute(
+                    text(f"DELETE FROM {HISTORY_TABLE} WHERE snapshot_ts >= :start AND snapshot_ts < :end"),
+                    {"start": chunk, "end": chunk + CHUNK_SECONDS},
+                )
+            removed += len(positions)
+            if progress:
+                progress(chunk, len(positions))
+
+    with get_engine().begin() as conn:
+        _set_horizon(conn, "raw", cutoff_ts)
+    return removed
+
+
+def expire_minute_tier(cutoff_ts):
+    """Drop downsampled positions and minute rollups older than ``cutoff_ts``."""
+    from streamlit_app.utils.rollups import ensure_rollup_tables, rollup_table
+
+    ensure_retention_tables()
+    ensure_rollup_tables()
+    cutoff_ts = int(cutoff_ts) - int(cutoff_ts) % DAY
+
+    with get_engine().begin() as conn:
+        removed = conn.execute(
+            text(f"DELETE FROM {DOWNSAMPLED_TABLE} WHERE snapshot_ts < :cutoff"),
+            {"cutoff": cutoff_ts},
+        ).rowcount
+        conn.execute(
+            text(f"DELETE FROM {rollup_table('minute')} WHERE bucket < :cutoff"),
+            {"cutoff": cutoff_ts},
+        )
+        _set_horizon(conn, "minute", cutoff_ts)
+    return removed
+
+
+def apply_retention(now_ts, raw_days=None, minute_days=None, progress=None):
+    """Run every tier's policy as of ``now_ts``; returns rows removed per tier."""
+    raw_days = RAW_RETENTION_DAYS if raw_days is None else raw_days
+    minute_days = MINUTE_RETENTION_DAYS if minute_days is None else minute_days
+
+    removed = {"raw": downsample_raw(now_ts - raw_days * DAY, progress=progress), "minute": 0}
+    if minute_days > 0:
+        # The minute tier never expires ahead of the raw tier feeding it
+        removed["minute"] = expire_minute_tier(now_ts - max(minute_days, raw_days) * DAY)
+    return removed
+
+
+def compact():
+    """Reclaim space freed by retention and re-sort the downsampled tier.
+
+    Postgres: ``CLUSTER`` rewrites the minute tier in primary-key (time)
+    order and ``VACUUM ANALYZE`` frees dead raw rows. SQLite: ``VACUUM``
+    rebuilds the whole file contiguously (the minute tier is already in
+    key order, see ``ensure_retention_tables``). Both need autocommit.
+    """
+    ensure_retention_tables()
+    engine = get_engine()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text(f"CLUSTER {DOWNSAMPLED_TABLE} USING {DOWNSAMPLED_TABLE}_pkey"))
+            conn.execute(text(f"VACUUM ANALYZE {DOWNSAMPLED_TABLE}"))
+            conn.execute(text(f"VACUUM ANALYZE {HISTORY_TABLE}"))
+        else:
+            conn.execute(text("VACUUM"))
+            conn.execute(text("ANALYZE"))
@@ -0,0 +1,316 @@
+"""Incrementally maintained traffic rollups.
+
+Aggregate charts (traffic per airport, per origin country, airborne vs
+grounded over time) read these tables instead of scanning raw
+positions. Each landed snapshot adds its counts to a minute, hour and
+day bucket; ``backfill`` rebuilds a range from ``position_history``.
+
+Every rollup row stores sums, so the average number of aircraft in a
+bucket is ``aircraft / snapshots`` where ``snapshots`` comes from the
+``all`` row of the same bucket.
+"""
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from streamlit_app.utils import refdata
+from streamlit_app.utils.db import get_engine, run_query
+
+
+# Bucket width in seconds per rollup grain
+GRAINS = {
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+# "all"     -> one row per bucket (key "all")
+# "country" -> origin_country
+# "airport" -> IATA code of the nearest Indian airport within AIRPORT_RADIUS
+DIMENSIONS = ("all", "country", "airport")
+
+# Radius (degrees) for attributing aircraft to an airport
+AIRPORT_RADIUS = 1.0
+
+# Positions per distance matrix in nearest_airport (bounds its memory)
+_AIRPORT_CHUNK = 50_000
+
+_tables_ready = False
+
+
+def rollup_table(grain):
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown rollup grain: {grain!r}")
+    return f"traffic_rollup_{grain}"
+
+
+def ensure_rollup_tables():
+    """Create one rollup table per grain if missing."""
+    global _tables_ready
+    if _tables_ready:
+        return
+
+    with get_engine().begin() as conn:
+        for grain in GRAINS:
+            conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {rollup_table(grain)} (
+                    dimension TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    key TEXT NOT NULL,
+                    snapshots INTEGER NOT NULL,
+                    aircraft INTEGER NOT NULL,
+                    airborne INTEGER NOT NULL,
+                    grounded INTEGER NOT NULL,
+                    PRIMARY KEY (dimension, bucket, key)
+                )
+            """))
+
+    _tables_ready = True
+
+
+def _load_airports():
+    """Indian airport coordinates used for attribution."""
+    return refdata.coded_airports()
+
+
+def nearest_airport(lat, lon, airports, radius=AIRPORT_RADIUS):
+    """Vectorized nearest-airport lookup.
+
+    Returns an object array of IATA codes (``None`` where no airport is
+    within ``radius`` degrees on both axes, matching the Airport
+    Explorer box filter).
+    """
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    codes = np.full(len(lat), None, dtype=object)
+    if airports is None or airports.empty or len(lat) == 0:
+        return codes
+
+    a_lat = airports["latitude"].to_numpy(dtype="float64")
+    a_lon = airports["longitude"].to_numpy(dtype="float64")
+    a_code = airports["iata_code"].to_numpy(dtype=object)
+
+    for lo in range(0, len(lat), _AIRPORT_CHUNK):
+        part = slice(lo, lo + _AIRPORT_CHUNK)
+        d_lat = np.abs(lat[part, None] - a_lat[None, :])
+        d_lon = np.abs(lon[part, None] - a_lon[None, :])
+        dist = np.where((d_lat <= radius) & (d_lon <= radius), d_lat ** 2 + d_lon ** 2, np.inf)
+
+        best = dist.argmin(axis=1)
+        hit = np.isfinite(dist[np.arange(len(best)), best])
+        codes[part][hit] = a_code[best[hit]]
+    return codes
+
+
+def snapshot_counts(df, airports=None, by=None):
+    """Aggregate one snapshot into ``dimension, key, aircraft, airborne, grounded``.
+
+    ``by`` names an extra column of ``df`` to group on and keep, e.g.
+    ``snapshot_ts`` to count many snapshots in one pass.
+    """
+    if airports is None:
+        airports = _load_airports()
+
+    grounded = (df["on_ground"] == True).to_numpy()  # noqa: E712
+    base = pd.DataFrame({
+        "aircraft": 1,
+        "airborne": (~grounded).astype("int64"),
+        "grounded": grounded.astype("int64"),
+    })
+    group = ["key"]
+    if by is not None:
+        base[by] = df[by].to_numpy()
+        group = [by, "key"]
+
+    keys = {
+        "all": np.full(len(df), "all", dtype=object),
+        "country": df["origin_country"].fillna("Unknown").to_numpy(dtype=object),
+        "airport": nearest_airport(df["latitude"], df["longitude"], airports),
+    }
+
+    frames = []
+    for dimension in DIMENSIONS:
+        counts = base.assign(key=keys[dimension]).dropna(subset=["key"])
+        counts = counts.groupby(group, sort=False).sum().reset_index()
+        counts.insert(0, "dimension", dimension)
+        frames.append(counts)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def _bucketed(counts, grain):
+    """Sum per-snapshot counts (with a ``snapshot_ts`` column) into ``grain`` buckets."""
+    width = GRAINS[grain]
+    ts = counts["snapshot_ts"].to_numpy(dtype="int64")
+    rows = counts.drop(columns="snapshot_ts").assign(bucket=ts - ts % width, snapshots=1)
+    return rows.groupby(["dimension", "bucket", "key"], sort=False).sum().reset_index()
+
+
+def _insert(conn, grain, rows, accumulate):
+    """Write bucketed rows; ``accumulate`` adds to existing buckets."""
+    table = rollup_table(grain)
+    conflict = f"""
+        ON CONFLICT (dimension, bucket, key) DO UPDATE SET
+            snapshots = {table}.snapshots + excluded.snapshots,
+            aircraft = {table}.aircraft + excluded.aircraft,
+            airborne = {table}.airborne + excluded.airborne,
+            grounded = {table}.grounded + excluded.grounded
+    """ if accumulate else ""
+    conn.execute(
+        text(f"""
+            INSERT INTO {table}
+                (dimension, bucket, key, snapshots, aircraft, airborne, grounded)
+            VALUES
+                (:dimension, :bucket, :key, :snapshots, :aircraft, :airborne, :grounded)
+            {conflict}
+        """),
+        rows.astype(object).to_dict("records"),
+    )
+
+
+def apply_snapshot(conn, df, ts):
+    """Add one snapshot's counts to every grain inside ``conn``'s transaction."""
+    counts = snapshot_counts(df)
+    if counts.empty:
+        return
+
+    counts["snapshot_ts"] = int(ts)
+    for grain in GRAINS:
+        _insert(conn, grain, _bucketed(counts, grain), accumulate=True)
+
+
+# Position columns snapshot_counts reads
+_COUNT_COLUMNS = ["origin_country", "latitude", "longitude", "on_ground"]
+
+
+def _read_positions(conn, bounds):
+    from streamlit_app.utils.history import HISTORY_TABLE
+
+    return pd.read_sql(
+        text(f"""
+            SELECT snapshot_ts, {', '.join(_COUNT_COLUMNS)}
+            FROM {HISTORY_TABLE}
+            WHERE snapshot_ts >= :start AND snapshot_ts < :end
+            ORDER BY snapshot_ts
+        """),
+        conn,
+        params=bounds,
+    )
+
+
+def backfill(start_ts, end_ts, progress=None):
+    """Rebuild every rollup grain for ``[start_ts, end_ts)`` from history.
+
+    The range is widened to whole days so no bucket is left holding a
+    partial sum. Days older than the raw retention horizon are skipped:
+    their raw positions have been downsampled, so rebuilding them would
+    lose counts. Returns the number of snapshots replayed; ``progress``
+    is called with each day's start and that day's count.
+
+    A day is aggregated in memory first. Only the swap (DELETE plus one
+    bulk INSERT per grain) runs in a transaction that blocks new
+    snapshots from being recorded; snapshots recorded during the
+    aggregation are picked up inside it, so none is lost or counted
+    twice, and an interrupted run leaves every day rebuilt or untouched.
+    """
+    from streamlit_app.utils import history, retention
+
+    ensure_rollup_tables()
+    history.ensure_history_tables()
+    day = GRAINS["day"]
+    start_ts = max(int(start_ts) - int(start_ts) % day, retention.raw_horizon())
+    end_ts = -(-int(end_ts) // day) * day
+    if start_ts >= end_ts:
+        return 0
+
+    engine = get_engine()
+    airports = _load_airports()
+    replayed = 0
+    for day_start in range(start_ts, end_ts, day):
+        bounds = {"start": day_start, "end": day_start + day}
+        with engine.connect() as conn:
+            positions = _read_positions(conn, bounds)
+        frames = [snapshot_counts(positions, airports, by="snapshot_ts")]
+        seen = set(positions["snapshot_ts"].tolist())
+        del positions
+
+        with engine.begin() as conn:
+            # record_snapshot claims snapshot_log first; holding it (or, on
+            # SQLite, the write lock the DELETE takes) makes recorders wait
+            if engine.dialect.name == "postgresql":
+                conn.execute(text("LOCK TABLE snapshot_log IN EXCLUSIVE MODE"))
+
+            for grain in GRAINS:
+                conn.execute(
+                    text(f"DELETE FROM {rollup_table(grain)} WHERE bucket >= :start AND bucket < :end"),
+                    bounds,
+                )
+
+            # Snapshots recorded since the read above had their counts
+            # deleted just now; add them back from history
+            logged = conn.execute(
+                text("SELECT snapshot_ts FROM snapshot_log WHERE snapshot_ts >= :start AND snapshot_ts < :end"),
+                bounds,
+            ).scalars().all()
+            late = sorted(set(logged) - seen)
+            if late:
+                positions = _read_positions(conn, dict(bounds, start=late[0]))
+                positions = positions[positions["snapshot_ts"].isin(late)]
+                frames.append(snapshot_counts(positions, airports, by="snapshot_ts"))
+                seen.update(positions["snapshot_ts"].tolist())
+
+            counts = pd.concat(frames, ignore_index=True)
+            if not counts.empty:
+                for grain in GRAINS:
+                    _insert(conn, grain, _bucketed(counts, grain), accumulate=False)
+
+        replayed += len(seen)
+        if progress and seen:
+            progress(day_start, len(seen))
+
+    return replayed
+
+
+def load_rollup(grain, dimension, start_ts, end_ts, keys=None):
+    """Read a rollup range as a DataFrame.
+
+    Columns: ``time, key, aircraft, airborne, grounded, snapshots,
+    avg_aircraft``. ``keys`` optionally restricts the dimension values.
+    """
+    ensure_rollup_tables()
+    table = rollup_table(grain)
+
+    params = {"dim": dimension, "start": int(start_ts), "end": int(end_ts)}
+    key_filter = ""
+    if keys:
+        names = [f"k{i}" for i in range(len(keys))]
+        key_filter = f"AND r.key IN ({', '.join(':' + n for n in names)})"
+        params.update(zip(names, keys))
+
+    df = run_query(
+        text(f"""
+            SELECT r.bucket, r.key, r.aircraft, r.airborne, r.grounded,
+                   t.snapshots
+            FROM {table} r
+            JOIN {table} t
+              ON t.dimension = 'all' AND t.key = 'all' AND t.bucket = r.bucket
+            WHERE r.dimension = :dim
+              AND r.bucket >= :start AND r.bucket < :end
+              {key_filter}
+            ORDER BY r.bucket
+        """),
+        params,
+    )
+
+    df["time"] = pd.to_datetime(df["bucket"], unit="s")
+    df["avg_aircraft"] = df["aircraft"] / df["snapshots"].clip(lower=1)
+    return df.drop(columns="bucket")
+
+
+def grain_for_span(seconds):
+    """Pick the coarsest grain that still gives a readable chart."""
+    if seconds <= 6 * 3600:
+        return "minute"
+    if seconds <= 14 * 86400:
+        return "hour"
+    return "day"
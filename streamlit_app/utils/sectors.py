@@ -0,0 +1,222 @@
+"""Airspace sector occupancy with grid-accelerated point-in-polygon.
+
+Sector polygons (FIRs, TMAs, ...) are read once from a GeoJSON file and
+"prepared": each sector gets a coarse grid over its bounding box where
+every cell is marked outside, inside, or boundary (touched by an edge).
+Per snapshot, an aircraft inside the bounding box is resolved by one
+grid lookup; only the few that land in boundary cells go through the
+exact even-odd ray test, and that test is vectorized over points x edges.
+
+GeoJSON features need ``Polygon`` or ``MultiPolygon`` geometry and a
+``name`` property; an optional ``kind`` property (e.g. ``FIR``/``TMA``)
+is carried through for display. Holes are handled by the even-odd rule.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SECTORS_PATH = os.getenv("SECTORS_PATH", os.path.join(PROJECT_ROOT, "data", "sectors.geojson"))
+
+# Grid resolution per sector bounding box (cells per axis)
+GRID_CELLS = 64
+
+OUTSIDE, INSIDE, BOUNDARY = 0, 1, 2
+
+# Points per chunk in the exact test, bounding the points x edges matrix
+_EXACT_CHUNK = 2048
+
+_lock = threading.Lock()
+_cache = {}
+
+
+def _points_in_edges(x, y, edges):
+    """Even-odd test of points against a set of ring edges ``(x1, y1, x2, y2)``."""
+    inside = np.zeros(len(x), dtype=bool)
+    if len(x) == 0 or len(edges) == 0:
+        return inside
+
+    x1, y1, x2, y2 = (edges[:, i][None, :] for i in range(4))
+    dy = np.where(y2 == y1, 1.0, y2 - y1)
+
+    for start in range(0, len(x), _EXACT_CHUNK):
+        px = x[start:start + _EXACT_CHUNK, None]
+        py = y[start:start + _EXACT_CHUNK, None]
+        straddles = (y1 > py) != (y2 > py)
+        x_cross = x1 + (py - y1) * (x2 - x1) / dy
+        crossings = np.count_nonzero(straddles & (px < x_cross), axis=1)
+        inside[start:start + _EXACT_CHUNK] = crossings % 2 == 1
+
+    return inside
+
+
+class Sector:
+    """One prepared sector polygon."""
+
+    def __init__(self, name, kind, rings):
+        self.name = name
+        self.kind = kind
+
+        edges = []
+        for ring in rings:
+            ring = np.asarray(ring, dtype="float64")[:, :2]
+            edges.append(np.hstack([ring[:-1], ring[1:]]))
+            if not np.array_equal(ring[0], ring[-1]):
+                edges.append(np.hstack([ring[-1:], ring[:1]]))
+        self.edges = np.vstack(edges)
+
+        xs = self.edges[:, [0, 2]]
+        ys = self.edges[:, [1, 3]]
+        self.bbox = (xs.min(), ys.min(), xs.max(), ys.max())
+        self._prepare_grid()
+
+    def _prepare_grid(self):
+        x0, y0, x1, y1 = self.bbox
+        self.cell_w = max((x1 - x0) / GRID_CELLS, 1e-9)
+        self.cell_h = max((y1 - y0) / GRID_CELLS, 1e-9)
+
+        grid = np.zeros((GRID_CELLS, GRID_CELLS), dtype="uint8")
+
+        # Every cell an edge's bounding box touches is a boundary candidate
+        cx = self._cell_x(self.edges[:, [0, 2]])
+        cy = self._cell_y(self.edges[:, [1, 3]])
+        for ax, bx, ay, by in zip(cx.min(1), cx.max(1), cy.min(1), cy.max(1)):
+            grid[ay:by + 1, ax:bx + 1] = BOUNDARY
+
+        # Remaining cells are wholly in or out; their center decides
+        free_y, free_x = np.nonzero(grid != BOUNDARY)
+        centers_x = x0 + (free_x + 0.5) * self.cell_w
+        centers_y = y0 + (free_y + 0.5) * self.cell_h
+        inside = _points_in_edges(centers_x, centers_y, self.edges)
+        grid[free_y[inside], free_x[inside]] = INSIDE
+
+        self.grid = grid
+
+    def _cell_x(self, x):
+        return np.clip(((x - self.bbox[0]) / self.cell_w).astype("int64"), 0, GRID_CELLS - 1)
+
+    def _cell_y(self, y):
+        return np.clip(((y - self.bbox[1]) / self.cell_h).astype("int64"), 0, GRID_CELLS - 1)
+
+    def contains(self, lon, lat):
+        """Boolean mask of positions inside this sector."""
+        x0, y0, x1, y1 = self.bbox
+        result = np.zeros(len(lon), dtype=bool)
+
+        candidates = np.flatnonzero((lon >= x0) & (lon <= x1) & (lat >= y0) & (lat <= y1))
+        if len(candidates) == 0:
+            return result
+
+        cx, cy = lon[candidates], lat[candidates]
+        status = self.grid[self._cell_y(cy), self._cell_x(cx)]
+
+        result[candidates[status == INSIDE]] = True
+        edge = status == BOUNDARY
+        if edge.any():
+            result[candidates[edge]] = _points_in_edges(cx[edge], cy[edge], self.edges)
+        return result
+
+
+class SectorIndex:
+    """All sectors from one GeoJSON file."""
+
+    def __init__(self, sectors):
+        self.sectors = sectors
+
+    def __len__(self):
+        return len(self.sectors)
+
+    @classmethod
+    def from_geojson(cls, path):
+        with open(path) as f:
+            features = json.load(f).get("features", [])
+
+        sectors = []
+        for feature in features:
+            geometry = feature.get("geometry") or {}
+            props = feature.get("properties") or {}
+            if geometry.get("type") == "Polygon":
+                rings = geometry["coordinates"]
+            elif geometry.get("type") == "MultiPolygon":
+                rings = [ring for polygon in geometry["coordinates"] for ring in polygon]
+            else:
+                continue
+            name = props.get("name") or f"Sector {len(sectors) + 1}"
+            sectors.append(Sector(name, props.get("kind", ""), rings))
+
+        return cls(sectors)
+
+    def membership(self, lon, lat):
+        """``(sector_index, point_index)`` pairs for every point inside a sector."""
+        lon = np.asarray(lon, dtype="float64")
+        lat = np.asarray(lat, dtype="float64")
+
+        sector_idx, point_idx = [], []
+        for i, sector in enumerate(self.sectors):
+            hits = np.flatnonzero(sector.contains(lon, lat))
+            sector_idx.append(np.full(len(hits), i, dtype="int64"))
+            point_idx.append(hits)
+
+        if not sector_idx:
+            return np.empty(0, dtype="int64"), np.empty(0, dtype="int64")
+        return np.concatenate(sector_idx), np.concatenate(point_idx)
+
+    def frame(self):
+        return pd.DataFrame({
+            "sector": [s.name for s in self.sectors],
+            "kind": [s.kind for s in self.sectors],
+        })
+
+
+def load_sectors(path=None):
+    """Prepared sectors for ``path`` (default ``SECTORS_PATH``), or ``None``.
+
+    Preparation runs once per file version; the result is reused until
+    the file's modification time changes.
+    """
+    path = path or SECTORS_PATH
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    with _lock:
+        cached = _cache.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, SectorIndex.from_geojson(path))
+            _cache[path] = cached
+        return cached[1]
+
+
+def _membership_keys(index, snap):
+    """Sorted ``sector << 24 | icao24`` keys for a snapshot."""
+    sector_idx, point_idx = index.membership(snap.column("longitude"), snap.column("latitude"))
+    icao = snap.codes("icao24")[point_idx].astype("int64")
+    return np.unique((sector_idx << 24) | icao)
+
+
+def occupancy(index, snap):
+    """Aircraft count per sector for one snapshot."""
+    sector_idx, _ = index.membership(snap.column("longitude"), snap.column("latitude"))
+    table = index.frame()
+    table["aircraft"] = np.bincount(sector_idx, minlength=len(index))
+    return table
+
+
+def transitions(index, previous, current):
+    """Entries into and exits from each sector between two snapshots."""
+    before = _membership_keys(index, previous)
+    after = _membership_keys(index, current)
+
+    entered = np.setdiff1d(after, before, assume_unique=True) >> 24
+    exited = np.setdiff1d(before, after, assume_unique=True) >> 24
+
+    table = index.frame()
+    table["entries"] = np.bincount(entered, minlength=len(index))
+    table["exits"] = np.bincount(exited, minlength=len(index))
+    return table
@@ -0,0 +1,261 @@
+"""Compact, array-backed aircraft snapshots.
+
+A ``Snapshot`` holds one OpenSky poll as a NumPy structured array of
+fixed-width fields (~47 bytes per aircraft). ``icao24`` is stored as its
+24-bit integer, and callsigns and origin countries are interned in
+process-wide dictionaries so repeated strings cost one int per row.
+Pages take zero-copy column views or cheap filtered views instead of
+each holding its own object-dtype pandas copy, which keeps hours of
+snapshots affordable in memory (see ``SnapshotHistory``).
+"""
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+SNAPSHOT_DTYPE = np.dtype([
+    ("icao24", "u4"),
+    ("callsign", "i4"),
+    ("origin_country", "i4"),
+    ("time_position", "i4"),
+    ("last_contact", "i4"),
+    ("longitude", "f4"),
+    ("latitude", "f4"),
+    ("baro_altitude", "f4"),
+    ("geo_altitude", "f4"),
+    ("velocity", "f4"),
+    ("heading", "f4"),
+    ("vertical_rate", "f4"),
+    ("on_ground", "?"),
+])
+
+# Missing epoch values in the int32 time fields
+MISSING_TIME = 0
+
+# Code for a missing string in an interned column
+MISSING_CODE = -1
+
+
+class StringDictionary:
+    """Append-only string interning table shared by all snapshots."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._codes = {}
+        self._values = []
+        self._lookup = np.empty(0, dtype=object)
+
+    def __len__(self):
+        return len(self._values)
+
+    def encode(self, values):
+        """Return int32 codes for ``values`` (``MISSING_CODE`` for blanks)."""
+        local, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+
+        with self._lock:
+            mapping = np.empty(len(uniques) + 1, dtype="int32")
+            mapping[-1] = MISSING_CODE  # factorize's -1 indexes the last slot
+            for i, value in enumerate(uniques):
+                code = self._codes.get(value)
+                if code is None:
+                    code = len(self._values)
+                    self._codes[value] = code
+                    self._values.append(value)
+                mapping[i] = code
+            self._lookup = np.asarray(self._values, dtype=object)
+
+        return mapping[local]
+
+    def decode(self, codes):
+        """Return an object array of strings (``None`` for missing)."""
+        codes = np.asarray(codes)
+        lookup = self._lookup
+        out = np.full(len(codes), None, dtype=object)
+        present = codes != MISSING_CODE
+        out[present] = lookup[codes[present]]
+        return out
+
+    def code_of(self, value):
+        """Code for ``value`` or ``MISSING_CODE`` if it was never seen."""
+        return self._codes.get(value, MISSING_CODE)
+
+
+CALLSIGNS = StringDictionary()
+COUNTRIES = StringDictionary()
+
+_DICTIONARIES = {
+    "callsign": CALLSIGNS,
+    "origin_country": COUNTRIES,
+}
+
+
+def _icao_to_int(values):
+    out = np.zeros(len(values), dtype="u4")
+    for i, value in enumerate(values):
+        try:
+            out[i] = int(value, 16)
+        except (TypeError, ValueError):
+            pass
+    return out
+
+
+def _clean_strings(series):
+    """Strip OpenSky's space padding and turn blanks into missing values."""
+    s = series.astype(object).where(series.notna(), None)
+    s = s.map(lambda v: (v.strip() or None) if isinstance(v, str) else None)
+    return s
+
+
+class Snapshot:
+    """One poll of aircraft states, optionally restricted to a row index.
+
+    The same snapshot is shared by every session, so its rows are made
+    read-only on construction: an in-place edit raises instead of
+    corrupting what other pages see.
+    """
+
+    __slots__ = ("ts", "_rows", "_index")
+
+    def __init__(self, rows, ts, index=None):
+        rows.flags.writeable = False
+        self.ts = ts
+        self._rows = rows
+        self._index = index
+
+    @classmethod
+    def blank(cls, ts=None):
+        return cls(np.empty(0, dtype=SNAPSHOT_DTYPE), ts)
+
+    @classmethod
+    def from_frame(cls, df, ts):
+        """Build a snapshot from a frame with OpenSky state columns.
+
+        Time columns may be absent (e.g. rows read back from history).
+        """
+        rows = np.zeros(len(df), dtype=SNAPSHOT_DTYPE)
+        if len(df) == 0:
+            return cls(rows, ts)
+
+        rows["icao24"] = _icao_to_int(df["icao24"].tolist())
+        rows["callsign"] = CALLSIGNS.encode(_clean_strings(df["callsign"]))
+        rows["origin_country"] = COUNTRIES.encode(_clean_strings(df["origin_country"]))
+
+        for name in ("time_position", "last_contact"):
+            if name not in df:
+                continue
+            values = pd.to_numeric(df[name], errors="coerce").fillna(MISSING_TIME)
+            rows[name] = values.to_numpy(dtype="int64")
+
+        for name in ("longitude", "latitude", "baro_altitude", "geo_altitude",
+                     "velocity", "heading", "vertical_rate"):
+            rows[name] = pd.to_numeric(df[name], errors="coerce").to_numpy(dtype="float32")
+
+        rows["on_ground"] = df["on_ground"].fillna(False).astype(bool).to_numpy()
+        return cls(rows, ts)
+
+    def __len__(self):
+        return len(self._rows) if self._index is None else len(self._index)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def nbytes(self):
+        """Bytes held by this snapshot's own arrays (shared base counted once)."""
+        index_bytes = 0 if self._index is None else self._index.nbytes
+        return self._rows.nbytes + index_bytes
+
+    @property
+    def rows(self):
+        """The structured array (a copy only when this is a filtered view)."""
+        return self._rows if self._index is None else self._rows[self._index]
+
+    def codes(self, name):
+        """Raw numeric values of a field (interned codes for string fields)."""
+        values = self._rows[name]
+        return values if self._index is None else values[self._index]
+
+    def column(self, name):
+        """Field values, decoded for string fields.
+
+        Numeric fields of an unfiltered snapshot are zero-copy, read-only
+        views of the structured array.
+        """
+        if name == "icao24":
+            return np.array([f"{v:06x}" for v in self.codes(name)], dtype=object)
+        if name in _DICTIONARIES:
+            return _DICTIONARIES[name].decode(self.codes(name))
+        if name in ("time_position", "last_contact"):
+            values = self.codes(name).astype("float64")
+            values[values == MISSING_TIME] = np.nan
+            return values
+        return self.codes(name)
+
+    def filter(self, mask):
+        """Filtered view sharing this snapshot's rows; only an index is stored."""
+        positions = np.flatnonzero(np.asarray(mask, dtype=bool))
+        if self._index is not None:
+            positions = self._index[positions]
+        return Snapshot(self._rows, self.ts, positions)
+
+    def take(self, positions):
+        """View of the rows at ``positions`` (in that order)."""
+        positions = np.asarray(positions, dtype="int64")
+        if self._index is not None:
+            positions = self._index[positions]
+        return Snapshot(self._rows, self.ts, positions)
+
+    def where_string(self, name, value):
+        """Boolean mask for an interned field equal to ``value``."""
+        code = _DICTIONARIES[name].code_of(value)
+        if code == MISSING_CODE:
+            return np.zeros(len(self), dtype=bool)
+        return self.codes(name) == code
+
+    def to_frame(self, columns=None):
+        """Materialize the requested columns as a pandas DataFrame."""
+        names = columns or list(SNAPSHOT_DTYPE.names)
+        return pd.DataFrame({name: self.column(name) for name in names})
+
+
+class SnapshotHistory:
+    """In-memory ring of recent snapshots, bounded by age."""
+
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._snapshots = deque()
+
+    def append(self, snapshot):
+        if snapshot.ts is None:
+            return
+        with self._lock:
+            if self._snapshots and self._snapshots[-1].ts >= snapshot.ts:
+                return
+            self._snapshots.append(snapshot)
+            cutoff = snapshot.ts - self.max_age
+            while self._snapshots and self._snapshots[0].ts < cutoff:
+                self._snapshots.popleft()
+
+    def window(self, seconds):
+        """Snapshots from the last ``seconds`` seconds, oldest first."""
+        with self._lock:
+            if not self._snapshots:
+                return []
+            cutoff = self._snapshots[-1].ts - seconds
+            return [s for s in self._snapshots if s.ts >= cutoff]
+
+    def latest(self):
+        with self._lock:
+            return self._snapshots[-1] if self._snapshots else None
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(s.nbytes for s in self._snapshots)
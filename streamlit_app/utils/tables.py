@@ -0,0 +1,125 @@
+"""Server-side paged tables.
+
+Handing a whole DataFrame to ``st.dataframe`` or AgGrid ships every row
+to the browser on every rerun. ``paged_table`` instead asks a data
+source for one page: searching, sorting and slicing run on the server
+(in pandas or NumPy) and only ``page_size`` rows are sent.
+
+A source implements ``columns`` and ``fetch(search_column, search_text,
+sort_column, ascending, offset, limit) -> (total, page_df)``.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+PAGE_SIZES = [25, 50, 100]
+
+
+class FrameSource:
+    """Pages over an in-memory DataFrame."""
+
+    def __init__(self, df):
+        self._df = df
+
+    @property
+    def columns(self):
+        return list(self._df.columns)
+
+    def fetch(self, search_column, search_text, sort_column, ascending, offset, limit):
+        df = self._df
+        if search_column and search_text:
+            df = df[df[search_column].astype(str).str.contains(search_text, case=False, na=False, regex=False)]
+
+        if sort_column:
+            df = df.sort_values(sort_column, ascending=ascending, kind="stable", na_position="last")
+
+        return len(df), df.iloc[offset:offset + limit]
+
+
+class SnapshotSource:
+    """Pages over a live ``Snapshot`` without materializing all rows.
+
+    ``columns`` maps snapshot field -> display name.
+    """
+
+    def __init__(self, snap, columns):
+        self._snap = snap
+        self._fields = dict(columns)
+        self._names = {v: k for k, v in self._fields.items()}
+
+    @property
+    def columns(self):
+        return list(self._fields.values())
+
+    def fetch(self, search_column, search_text, sort_column, ascending, offset, limit):
+        snap = self._snap
+
+        if search_column and search_text:
+            values = pd.Series(snap.column(self._names[search_column]))
+            mask = values.astype(str).str.contains(search_text, case=False, na=False, regex=False)
+            snap = snap.filter(mask.to_numpy())
+
+        positions = np.arange(len(snap))
+        if sort_column:
+            keys = pd.Series(snap.column(self._names[sort_column]))
+            positions = keys.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+
+        page = snap.take(positions[offset:offset + limit])
+        df = page.to_frame(list(self._fields)).rename(columns=self._fields)
+        return len(snap), df
+
+
+def paged_table(source, key, page_size=25, render=None):
+    """Render one server-side page of ``source`` with search/sort controls.
+
+    ``render`` draws the page DataFrame (defaults to ``st.dataframe``).
+    Returns the page that was shown.
+    """
+    columns = source.columns
+    page_key = f"{key}_page"
+
+    def first_page():
+        # New search/sort/size: results start over at page 1
+        st.session_state[page_key] = 1
+
+    c1, c2, c3, c4, c5 = st.columns([2, 3, 2, 1, 1])
+    search_column = c1.selectbox("Search in", columns, key=f"{key}_search_col", on_change=first_page)
+    search_text = c2.text_input("Search", key=f"{key}_search", on_change=first_page)
+    sort_column = c3.selectbox("Sort by", [""] + columns, key=f"{key}_sort", on_change=first_page)
+    ascending = c4.selectbox("Order", ["Asc", "Desc"], key=f"{key}_order", on_change=first_page) == "Asc"
+    page_size = c5.selectbox(
+        "Rows", PAGE_SIZES, index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 0,
+        key=f"{key}_rows", on_change=first_page
+    )
+
+    page = st.session_state.get(page_key, 1)
+
+    total, df = source.fetch(
+        search_column, search_text.strip(), sort_column, ascending,
+        (page - 1) * page_size, page_size,
+    )
+
+    pages = max(1, math.ceil(total / page_size))
+    if page > pages:
+        # Filter shrank the result; jump back to the last page
+        page = pages
+        st.session_state[page_key] = page
+        total, df = source.fetch(
+            search_column, search_text.strip(), sort_column, ascending,
+            (page - 1) * page_size, page_size,
+        )
+
+    if render is None:
+        st.dataframe(df, use_container_width=True, hide_index=True)
+    else:
+        render(df)
+
+    first = (page - 1) * page_size
+    c1, c2 = st.columns([1, 3])
+    c1.number_input("Page", min_value=1, max_value=pages, key=page_key)
+    c2.caption(f"Rows {min(first + 1, total)}–{min(first + page_size, total)} of {total}")
+
+    return df
@@ -0,0 +1,184 @@
+"""Holding-pattern and go-around detection over recent tracks.
+
+The last few minutes of snapshots are stacked into one set of arrays,
+sorted by (aircraft, time), and every per-aircraft statistic is computed
+with grouped NumPy reductions (``bincount`` / ``reduceat``), so the cost
+is one sort plus a handful of array passes regardless of how many
+aircraft are tracked.
+
+* Holding: airborne, the signed heading change adds up to at least
+  ``HOLDING_MIN_TURN_DEG`` and the whole track stays within
+  ``HOLDING_MAX_RADIUS_KM`` of its centroid.
+* Go-around: the track descends to a low point near an airport and then
+  climbs again without touching the ground.
+"""
+import numpy as np
+import pandas as pd
+
+from streamlit_app.utils.phases import altitude_m, haversine_km, nearest_airport_km
+from streamlit_app.utils.snapshot import CALLSIGNS
+
+
+# Track window analysed on each poll (seconds)
+TRACK_WINDOW_S = 600
+
+# Minimum samples per aircraft before it is considered
+MIN_SAMPLES = 4
+
+HOLDING_MIN_TURN_DEG = 360.0
+HOLDING_MAX_RADIUS_KM = 25.0
+
+# Holding / go-around is attributed to an airport within this distance
+AIRPORT_MAX_KM = 80.0
+
+# Go-around: low point below this altitude and this close to an airport
+GO_AROUND_MAX_ALT_M = 1200.0
+GO_AROUND_MAX_KM = 15.0
+# ... with at least this much descent before and climb after it
+GO_AROUND_MIN_DROP_M = 150.0
+GO_AROUND_MIN_CLIMB_M = 150.0
+
+_EVENT_COLUMNS = ["icao24", "callsign", "latitude", "longitude", "iata_code", "airport_km"]
+
+
+class Tracks:
+    """Stacked, (aircraft, time)-sorted positions with group boundaries."""
+
+    def __init__(self, snapshots):
+        snapshots = [s for s in snapshots if not s.empty]
+        if not snapshots:
+            self.size = 0
+            self.groups = 0
+            return
+
+        rows = np.concatenate([s.rows for s in snapshots])
+        ts = np.concatenate([np.full(len(s), s.ts, dtype="int64") for s in snapshots])
+
+        order = np.lexsort((ts, rows["icao24"]))
+        rows = rows[order]
+
+        self.size = len(rows)
+        self.ts = ts[order]
+        self.icao24 = rows["icao24"]
+        self.callsign = rows["callsign"]
+        self.lat = rows["latitude"].astype("float64")
+        self.lon = rows["longitude"].astype("float64")
+        self.heading = rows["heading"].astype("float64")
+        self.altitude = altitude_m(rows["geo_altitude"], rows["baro_altitude"]).astype("float64")
+        self.on_ground = rows["on_ground"]
+
+        new_group = np.empty(self.size, dtype=bool)
+        new_group[0] = True
+        new_group[1:] = self.icao24[1:] != self.icao24[:-1]
+        self.starts = np.flatnonzero(new_group)
+        self.ends = np.append(self.starts[1:], self.size) - 1
+        self.group = np.cumsum(new_group) - 1
+        self.groups = len(self.starts)
+        self.counts = np.diff(np.append(self.starts, self.size))
+
+    def _per_group_sum(self, values):
+        return np.bincount(self.group, weights=values, minlength=self.groups)
+
+
+def turn_degrees(tracks):
+    """Signed cumulative heading change per aircraft (degrees)."""
+    same = tracks.group[1:] == tracks.group[:-1]
+    delta = (np.diff(tracks.heading) + 180.0) % 360.0 - 180.0
+    delta = np.where(same & np.isfinite(delta), delta, 0.0)
+    return np.bincount(tracks.group[1:], weights=delta, minlength=tracks.groups)
+
+
+def _event_frame(tracks, groups, lat, lon, airports):
+    """Common output columns for detected events, attributed to airports."""
+    if len(groups) == 0:
+        return pd.DataFrame(columns=_EVENT_COLUMNS)
+
+    idx, km = nearest_airport_km(
+        lat, lon,
+        airports["latitude"].to_numpy(dtype="float64"),
+        airports["longitude"].to_numpy(dtype="float64"),
+    )
+    codes = np.full(len(groups), None, dtype=object)
+    near = (idx >= 0) & (km <= AIRPORT_MAX_KM)
+    codes[near] = airports["iata_code"].to_numpy(dtype=object)[idx[near]]
+
+    last = tracks.ends[groups]
+    return pd.DataFrame({
+        "icao24": [f"{v:06x}" for v in tracks.icao24[last]],
+        "callsign": CALLSIGNS.decode(tracks.callsign[last]),
+        "latitude": lat,
+        "longitude": lon,
+        "iata_code": codes,
+        "airport_km": np.round(km, 1),
+    })
+
+
+def detect_holding(tracks, airports):
+    """Aircraft flying a holding pattern in the track window."""
+    if tracks.size == 0:
+        return pd.DataFrame(columns=_EVENT_COLUMNS + ["turn_deg", "radius_km"])
+
+    turn = turn_degrees(tracks)
+    airborne = tracks._per_group_sum(tracks.on_ground.astype("float64")) == 0
+
+    # Centroid, then the furthest excursion from it
+    c_lat = tracks._per_group_sum(tracks.lat) / tracks.counts
+    c_lon = tracks._per_group_sum(tracks.lon) / tracks.counts
+    dist = haversine_km(tracks.lat, tracks.lon, c_lat[tracks.group], c_lon[tracks.group])
+    radius = np.maximum.reduceat(dist, tracks.starts)
+
+    holding = np.flatnonzero(
+        (tracks.counts >= MIN_SAMPLES) & airborne &
+        (np.abs(turn) >= HOLDING_MIN_TURN_DEG) &
+        (radius <= HOLDING_MAX_RADIUS_KM)
+    )
+
+    events = _event_frame(tracks, holding, c_lat[holding], c_lon[holding], airports)
+    events["turn_deg"] = np.round(turn[holding], 0)
+    events["radius_km"] = np.round(radius[holding], 1)
+    return events
+
+
+def detect_go_arounds(tracks, airports):
+    """Aircraft that descended toward an airport and climbed away again."""
+    if tracks.size == 0:
+        return pd.DataFrame(columns=_EVENT_COLUMNS + ["low_alt_m"])
+
+    alt = np.where(np.isfinite(tracks.altitude), tracks.altitude, np.inf)
+    low = np.minimum.reduceat(alt, tracks.starts)
+
+    # Position of each group's low point (first row at the minimum)
+    pos = np.arange(tracks.size)
+    low_pos = np.minimum.reduceat(np.where(alt == low[tracks.group], pos, tracks.size), tracks.starts)
+
+    # Highest altitude before and after the low point
+    known = np.nan_to_num(tracks.altitude, nan=-np.inf)
+    split = low_pos[tracks.group]
+    peak_before = np.maximum.reduceat(np.where(pos < split, known, -np.inf), tracks.starts)
+    peak_after = np.maximum.reduceat(np.where(pos > split, known, -np.inf), tracks.starts)
+
+    airborne = tracks._per_group_sum(tracks.on_ground.astype("float64")) == 0
+
+    candidates = np.flatnonzero(
+        (tracks.counts >= MIN_SAMPLES) & airborne &
+        (low < GO_AROUND_MAX_ALT_M) &
+        (peak_before - low >= GO_AROUND_MIN_DROP_M) &
+        (peak_after - low >= GO_AROUND_MIN_CLIMB_M)
+    )
+    if len(candidates) == 0:
+        return pd.DataFrame(columns=_EVENT_COLUMNS + ["low_alt_m"])
+
+    at = low_pos[candidates]
+    events = _event_frame(tracks, candidates, tracks.lat[at], tracks.lon[at], airports)
+    events["low_alt_m"] = np.round(low[candidates], 0)
+    return events[events["airport_km"] <= GO_AROUND_MAX_KM].reset_index(drop=True)
+
+
+def airport_event_counts(holding, go_arounds):
+    """Holding and go-around counts per airport."""
+    counts = pd.concat([
+        holding["iata_code"].value_counts().rename("holding"),
+        go_arounds["iata_code"].value_counts().rename("go_arounds"),
+    ], axis=1).fillna(0).astype(int)
+    counts.index.name = "iata_code"
+    return counts.sort_values(["holding", "go_arounds"], ascending=False).reset_index()